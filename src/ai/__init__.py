@@ -1 +1,2 @@
-from .embedding_generator import EmbeddingGenerator, Models
\ No newline at end of file
+from .embedding_generator import EmbeddingGenerator, Models
+from .embedding_cache import EmbeddingCacheABC, LRUEmbeddingCache
\ No newline at end of file
@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+from typing import Optional, Tuple
+
+from torch import Tensor
+
+
+class EmbeddingCacheABC(ABC):
+    """Abstract base class for caches of generated embeddings."""
+
+    @abstractmethod
+    def get(self, model_name: str, text: str) -> Optional[Tensor]:
+        """
+        Look up the embedding of a text.
+
+        Args
+        ----
+        model_name : str
+            the name of the model which generated the embedding
+        text : str
+            the embedded text
+
+        Returns
+        -------
+        Optional[Tensor]
+            the cached embedding, or None on a miss
+        """
+        ...
+
+    @abstractmethod
+    def put(self, model_name: str, text: str, embedding: Tensor) -> None:
+        """
+        Store the embedding of a text.
+
+        Args
+        ----
+        model_name : str
+            the name of the model which generated the embedding
+        text : str
+            the embedded text
+        embedding : Tensor
+            the embedding to store. It must not be modified afterwards.
+        """
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop all cached embeddings, e.g. after the model was swapped."""
+        ...
+
+
+class LRUEmbeddingCache(EmbeddingCacheABC):
+    """
+    Keeps the embeddings of the most recently used texts in memory.
+
+    Texts are keyed by their SHA-256 digest, so long note contents
+    are not kept alive by the cache.
+    """
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args
+        ----
+        maxsize : int
+            the amount of embeddings to keep before the least
+            recently used one is evicted
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Tuple[str, bytes], Tensor] = OrderedDict()
+
+    @staticmethod
+    def _key(model_name: str, text: str) -> Tuple[str, bytes]:
+        return model_name, hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get(self, model_name: str, text: str) -> Optional[Tensor]:
+        key = self._key(model_name, text)
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+        return embedding
+
+    def put(self, model_name: str, text: str, embedding: Tensor) -> None:
+        key = self._key(model_name, text)
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,10 +1,16 @@
 from abc import ABC, abstractclassmethod, abstractmethod, abstractstaticmethod
-from datetime import datetime
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from functools import partial
+import logging
+import time
+
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Any, Sequence
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
+import torch
 from torch import Tensor
 from src.api import LoggingProvider
 
@@ -14,14 +20,42 @@ class Models(Enum):
     PARAPHRASE_MPNET_BASE_V2 = "sentence-transformers/paraphrase-mpnet-base-v2"
     DISTILBERT_BASE_NLI_STSB_ELECTRA = "sentence-transformers/distilbert-base-nli-stsb-mean-tokens"
 
+# dtype in which the embeddings of a model are returned and stored;
+# the embedding column is a halfvec, so FP16 loses nothing on the way
+STORAGE_DTYPES: Dict[Models, type] = {
+    Models.MINI_LM_L6_V2: np.float16,
+    Models.PARAPHRASE_MPNET_BASE_V2: np.float16,
+    Models.DISTILBERT_BASE_NLI_STSB_ELECTRA: np.float16,
+}
+
 class EmbeddingGeneratorABC(ABC):
     """Abstract base class for embedding generators."""
 
 
     @abstractmethod
-    def generate(self, text: str) -> Tensor:
+    def generate(self, text: str | List[str]) -> Tensor:
+        """
+        Generate embeddings for one or many texts.
+
+        Args
+        ----
+        text : str | List[str]
+            A single text or a list of texts. Lists are encoded in one batched
+            forward pass.
+
+        Returns
+        -------
+        Tensor
+            A 1-D embedding for a single text, or a 2-D tensor with one row
+            per text for a list.
+        """
         pass
 
+    @abstractmethod
+    async def agenerate(self, text: str | List[str]) -> Tensor:
+        """Same as `generate`, but runs the model without blocking the event loop."""
+        ...
+
     @staticmethod
     def tensor_to_str_vec(tensor: Tensor) -> str:
         """
@@ -43,7 +77,8 @@ class EmbeddingGeneratorABC(ABC):
         - 1-D tensor `[1.0, 2.0, 3.0]` -> `"[1.0,2.0,3.0]"`
         - 2-D tensor `[[1, 2], [3, 4]]` -> `"[[1,2],[3,4]]"`
         """
-        return f"[{','.join(str(x) for x in tensor.tolist())}]"
+        # list.__repr__ formats all floats in C; only the separators need fixing
+        return repr(tensor.tolist()).replace(" ", "")
 
     @staticmethod
     def str_vec_to_list(vec_str: str) -> Sequence[float]:
@@ -61,6 +96,11 @@ class EmbeddingGeneratorABC(ABC):
         Sequence[np.float32]
             A list of floats extracted from the string representation.
 
+        Raises
+        ------
+        ValueError
+            if a value is not a number
+
         Examples
         ---------
         - Input: `"[1.0,2.0,3.0]"` -> Output: `[1.0, 2.0, 3.0]`
@@ -69,7 +109,9 @@ class EmbeddingGeneratorABC(ABC):
         vec_str = vec_str.strip().lstrip("[").rstrip("]")
         if not vec_str:
             return []
-        return [float(x) for x in vec_str.split(",")]
+        # parses all values in C instead of one float() call per value;
+        # raises ValueError for malformed values, unlike np.fromstring
+        return np.array(vec_str.split(","), dtype=np.float64).tolist()
 
     @property
     @abstractmethod
@@ -80,16 +122,141 @@ class EmbeddingGeneratorABC(ABC):
 
 class EmbeddingGenerator(EmbeddingGeneratorABC):
     """Generates embeddings for given text using specified model."""
-    def __init__(self, model_name: Models, logging_provider: LoggingProvider):
-        self.model = SentenceTransformer(model_name.value)
+    def __init__(
+        self,
+        model_name: Models,
+        logging_provider: LoggingProvider,
+        batch_size: int = 32,
+        quantize: bool = False,
+        max_batch_delay: float = 0.005,
+    ):
+        """
+        Args
+        ----
+        model_name : Models
+            the model to load
+        logging_provider : LoggingProvider
+            provides the logger for this instance
+        batch_size : int
+            the batch size used by the model when encoding lists of texts
+        quantize : bool
+            on CPU, apply dynamic int8 quantization to the linear layers.
+            On CUDA the model always runs in FP16.
+        max_batch_delay : float
+            seconds `submit` waits for more texts before flushing a batch
+            smaller than `batch_size`
+        """
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer(model_name.value, device=self.device)
+        self.model.eval()
+        if self.device == "cuda":
+            self.model.half()
+        elif quantize:
+            torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
         self.model_enum = model_name
+        self._store_dtype = STORAGE_DTYPES.get(model_name, np.float32)
+        self.batch_size = batch_size
         self.log = logging_provider(__name__, self)
+        # dedicated stream, so encoding does not serialize with work on the default stream
+        self._stream = torch.cuda.Stream() if self.device == "cuda" else None
+        # torch releases the GIL during forward(); one worker avoids contention on the model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        # micro-batcher state for `submit`
+        self.max_batch_delay = max_batch_delay
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # the first forward pass initializes kernels and tokenizer buffers lazily;
+        # pay for that here instead of on the first request
+        self.generate([" ", " "])
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def generate(self, text: str | List[str]) -> Tensor:
+        texts = [text] if isinstance(text, str) else text
+        start = time.perf_counter_ns() if self.log.isEnabledFor(logging.DEBUG) else 0
+        # stream(None) is a no-op on CPU
+        with torch.inference_mode(), torch.cuda.stream(self._stream):
+            embeddings = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                device=self.device,
+            ).astype(self._store_dtype, copy=False)
+        if start:
+            self.log.debug(
+                "Embedding generation of %d text(s) took: %.2f ms",
+                len(texts), (time.perf_counter_ns() - start) / 1e6
+            )
+        if isinstance(text, str):
+            return embeddings[0]
+        return embeddings
+
+    async def agenerate(self, text: str | List[str]) -> Tensor:
+        if isinstance(text, str):
+            return await self.submit(text)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.generate, text)
+
+    async def submit(self, text: str) -> Tensor:
+        """
+        Queue a text for the next batched forward pass and wait for its embedding.
 
-    def generate(self, text: str) -> Tensor:
-        start = datetime.now()
-        embedding = self.model.encode(text)
-        self.log.debug(f"Embedding generation took: {datetime.now() - start}")
-        return embedding
+        Concurrent callers are coalesced into one `generate` call, which is
+        flushed once `batch_size` texts are pending or `max_batch_delay`
+        has passed since the first one.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_batch_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        result = asyncio.get_running_loop().run_in_executor(
+            self._executor, self.generate, [text for text, _ in batch]
+        )
+        result.add_done_callback(partial(self._resolve_batch, batch))
+
+    @staticmethod
+    def _resolve_batch(batch: List[Tuple[str, asyncio.Future]], result: asyncio.Future) -> None:
+        """fans the batched result (or its error) back out to the waiting callers"""
+        error = result.exception() if not result.cancelled() else asyncio.CancelledError()
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                # caller was cancelled in the meantime
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result.result()[i])
+
+    def close(self) -> None:
+        """
+        Shut down the worker thread, after the running forward pass finished.
+        Texts which were submitted but not flushed yet fail with a RuntimeError.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("EmbeddingGenerator was closed"))
+        self._executor.shutdown(wait=True)
 
     @property
     def model_name(self) -> str:
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Optional, Callable
+from datetime import datetime
+from typing import Optional, Callable, Tuple
 import logging
 
 type LoggingProvider = Callable[[str, Optional[object]], logging.Logger]
@@ -7,4 +8,7 @@ type LoggingProvider = Callable[[str, Optional[object]], logging.Logger]
 @dataclass
 class Pagination:
     limit: int
-    offset: int
\ No newline at end of file
+    offset: int
+    after: Optional[Tuple[Optional[datetime], int]] = None
+    """keyset cursor `(updated_at, note_id)` of the last note of the previous
+    page. Used instead of `offset` by searches which order by date"""
\ No newline at end of file
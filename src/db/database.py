@@ -1,67 +1,101 @@
 from abc import ABC, abstractmethod
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import functools
-from typing import Awaitable, Callable, Coroutine, Dict, Optional, List, Any
+import logging
+import struct
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Iterable, Optional, List, Any, Sequence, Tuple
 import asyncpg
 from asyncpg import Pool, Connection, Record
+from asyncpg.prepared_stmt import PreparedStatement
+import numpy as np
 
 from src.api.types import LoggingProvider
-from src.utils.singleton import SingletonMeta
 
 
+def _strip_str(arg: str) -> str:
+    if len(arg) > 100:
+        return f"{arg[:100]}... (len={len(arg)})"
+    return arg
+
+def _keep(arg: Any) -> Any:
+    return arg
+
+# base type -> formatter; everything else is logged by its repr
+_STRIP_FORMATTERS: Dict[type, Callable[[Any], Any]] = {
+    str: _strip_str,
+    int: _keep,
+    float: _keep,
+    complex: _keep,
+}
+# exact type -> formatter, filled with subclasses (e.g. str enums) on first use
+_STRIP_DISPATCH: Dict[type, Callable[[Any], Any]] = dict(_STRIP_FORMATTERS)
+
+def _strip_formatter(arg_type: type) -> Callable[[Any], Any]:
+    for base, formatter in _STRIP_FORMATTERS.items():
+        if issubclass(arg_type, base):
+            break
+    else:
+        formatter = repr
+    _STRIP_DISPATCH[arg_type] = formatter
+    return formatter
+
 def strip_args(*args: Any) -> List[Any]:
     """strips strings or numbers to max 100 chars/values for logging purposes"""
-    stripped = []
-    for arg in args:
-        if isinstance(arg, str):
-            if len(arg) > 100:
-                stripped.append(f"{arg[:100]}... (len={len(arg)})")
-            else:
-                stripped.append(arg)
-        elif isinstance(arg, (int, float, complex)):
-            stripped.append(arg)
-        else:
-            stripped.append(repr(arg))
-    return stripped
-
-def acquire(func: Callable[..., Any]) -> Callable[..., Any]:
-    """
-    Wrapper for a coroutine which injects
-    an aquired connection as first parameter
-    """
-   
+    return [
+        (_STRIP_DISPATCH.get(type(arg)) or _strip_formatter(type(arg)))(arg)
+        for arg in args
+    ]
 
-    @functools.wraps(func)
-    async def wrapper(self: "Database", *coro_args, **coro_kwargs) -> Any:
-        if isinstance(self, str):
-            coro_args = (self, *coro_args)
-            self = Database.get_instance()
+_NO_STATEMENTS: Dict[str, PreparedStatement] = {}
 
-        # aquire pool from DatabaseConnection
-        pool = self.pool
+def _vector_codec(dtype: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], List[float]]]:
+    """creates encoder and decoder for the binary pgvector wire format:
+    uint16 dimension, uint16 unused, followed by big-endian values of `dtype`"""
+    def encode(value: Any) -> bytes:
+        array = np.asarray(value, dtype=dtype).ravel()
+        return struct.pack("!HH", array.size, 0) + array.tobytes()
 
-        async with pool.acquire() as connection:
-            # aquired connection
-            async with connection.transaction():
-                # started transaction
-                # -> call coroutine inside the transaction
-                # and pass the connection as first arg
-                return await func(
-                    self,
-                    *coro_args,
-                    _cxn=connection,
-                    **coro_kwargs
-                )
-    return wrapper
-
-def copy_docs(copy_from_func: Callable):
-    """decorator factory to replace the function docs with the given ones"""
-    def decocator(func: Callable):
+    def decode(data: bytes) -> List[float]:
+        dim, _ = struct.unpack_from("!HH", data)
+        return np.frombuffer(data, dtype=dtype, count=dim, offset=4).tolist()
+
+    return encode, decode
+
+encode_vector, decode_vector = _vector_codec(">f4")
+encode_halfvec, decode_halfvec = _vector_codec(">f2")
+
+def acquire(transaction: bool = True) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Wrapper factory for a coroutine which injects
+    an aquired connection as `_cxn` parameter
+
+    Args:
+    -----
+    transaction: `bool`
+        whether to run the coroutine inside a transaction. A single
+        statement is atomic on its own, so selections can skip the
+        BEGIN/COMMIT round trips.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-        wrapper.__doc__ = copy_from_func.__doc__
+        async def wrapper(self: "Database", *coro_args, **coro_kwargs) -> Any:
+            async def run(connection: Connection) -> Any:
+                if not transaction:
+                    return await func(self, *coro_args, _cxn=connection, **coro_kwargs)
+                async with connection.transaction():
+                    return await func(self, *coro_args, _cxn=connection, **coro_kwargs)
+
+            pinned = self._pinned.get()
+            if pinned is not None and pinned[0] is asyncio.current_task():
+                return await run(pinned[1])
+            # the pool attribute is read directly; the checked `pool`
+            # property is for callers outside of the query path
+            async with self._pool.acquire() as connection:  # type: ignore[union-attr]
+                return await run(connection)
         return wrapper
-    return decocator
+    return decorator
 
 class DatabaseABC(ABC):
     """Abstract Base Class for Database connections."""
@@ -79,7 +113,19 @@ class DatabaseABC(ABC):
     def pool(self) -> asyncpg.Pool:
         """Returns the database connection pool."""
         ...
+
+    @property
+    @abstractmethod
+    def max_pool_size(self) -> int:
+        """Returns the maximum amount of concurrently open connections."""
+        ...
     
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[Connection]:
+        """Acquires a connection and starts a transaction on it, for
+        callers which need multiple statements to be atomic."""
+        ...
+
     @abstractmethod
     async def execute(self, query: str, *args: Any) -> str:
         """Executes an SQL command (or commands)."""
@@ -89,6 +135,17 @@ class DatabaseABC(ABC):
     async def fetch(self, query: str, *args: Any) -> List[Dict]:
         """Fetches multiple records from the database."""
         ...
+
+    @abstractmethod
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        records: Iterable[Sequence[Any]],
+        columns: Sequence[str],
+        schema_name: Optional[str] = None,
+    ) -> str:
+        """Copies records into a table with the binary COPY protocol."""
+        ...
     
     @abstractmethod
     async def fetchrow(self, query: str, *args: Any) -> Optional[Dict]:
@@ -96,24 +153,109 @@ class DatabaseABC(ABC):
         ...
     
 class Database(DatabaseABC):
-    _instance: Optional["Database"] = None
-    def __init__(self, dsn: str, log: LoggingProvider, init_file: str = "src/init.sql"):
+    HOT_QUERIES: List[str] = []
+    """queries which are prepared up front on every new pool connection"""
+
+    def __init__(
+        self,
+        dsn: str,
+        log: LoggingProvider,
+        init_file: str = "src/init.sql",
+        statement_cache_size: int = 1024,
+        min_pool_size: int = 2,
+        max_pool_size: int = 10,
+    ):
+        """
+        Args:
+        -----
+        dsn: `str`
+            the connection string of the database
+        log: `LoggingProvider`
+            provides the logger for this instance
+        init_file: `str`
+            path to the SQL script which is executed on `init_db`
+        statement_cache_size: `int`
+            size of the per-connection LRU of prepared statements, keyed
+            by query text. Queries with a stable text skip parse/plan.
+        min_pool_size: `int`
+            amount of connections which are opened up front and kept open
+        max_pool_size: `int`
+            maximum amount of concurrently open connections
+        """
         self._pool: Optional[Pool] = None
         self._dsn: str = dsn
-        self._instance = self
         self._log = log(__name__, self)
         self._init_file_path = init_file
+        self._statement_cache_size = statement_cache_size
+        self._min_pool_size = min_pool_size
+        self._max_pool_size = max_pool_size
+        # server pid of a pool connection -> its prepared hot queries
+        self._prepared: Dict[int, Dict[str, PreparedStatement]] = {}
+        # connection pinned by `pinned_connection`, with the task that owns it
+        self._pinned: ContextVar[Optional[Tuple[asyncio.Task, Connection]]] = ContextVar(
+            f"pinned_connection_{id(self)}", default=None
+        )
+
+    @classmethod
+    def register_hot_queries(cls, *queries: str) -> None:
+        """
+        Registers queries which should be prepared when a pool connection
+        is created, so that their first use does not pay for parsing and
+        planning. Has to be called before `init_db`.
+
+        Args:
+        -----
+        queries: `str`
+            the exact query texts, as they are passed to `fetch`/`fetchrow`
+        """
+        for query in queries:
+            if query not in cls.HOT_QUERIES:
+                cls.HOT_QUERIES.append(query)
     
     async def init_db(self):
-        self._pool = await asyncpg.create_pool(dsn=self._dsn)
-        self._log.info("Database connected")
-        
+        # init.sql creates the vector extension, which has to exist
+        # before the pool connections can register the codec for it
         content = ""
         with open(self._init_file_path) as f:
             content = f.read()
-        await self._pool.execute(content)
+        connection = await asyncpg.connect(dsn=self._dsn)
+        try:
+            await connection.execute(content)
+        finally:
+            await connection.close()
         self._log.info("Database initialized with init.sql")
 
+        self._pool = await asyncpg.create_pool(
+            dsn=self._dsn,
+            statement_cache_size=self._statement_cache_size,
+            min_size=self._min_pool_size,
+            max_size=self._max_pool_size,
+            init=self._init_connection,
+        )
+        self._log.info("Database connected")
+
+    async def _init_connection(self, connection: Connection) -> None:
+        """registers the binary codecs for pgvector and prepares the
+        hot queries on a new pool connection"""
+        await connection.set_type_codec(
+            "vector",
+            schema="public",
+            encoder=encode_vector,
+            decoder=decode_vector,
+            format="binary",
+        )
+        await connection.set_type_codec(
+            "halfvec",
+            schema="public",
+            encoder=encode_halfvec,
+            decoder=decode_halfvec,
+            format="binary",
+        )
+        prepared = {query: await connection.prepare(query) for query in self.HOT_QUERIES}
+        pid = connection.get_server_pid()
+        self._prepared[pid] = prepared
+        connection.add_termination_listener(lambda _: self._prepared.pop(pid, None))
+
     async def close(self):
         if self._pool:
             await self._pool.close()
@@ -130,12 +272,61 @@ class Database(DatabaseABC):
         assert self._pool
         return self._pool
 
-    @classmethod
-    def get_instance(cls) -> "Database":
-        assert cls._instance
-        return cls._instance
+    @property
+    def max_pool_size(self) -> int:
+        return self._max_pool_size
+
+    @asynccontextmanager
+    async def pinned_connection(self) -> AsyncIterator[Connection]:
+        """
+        Acquire one connection and run all queries of the current task on
+        it until the block exits, instead of acquiring a connection per
+        query. Bursts of small queries thereby skip the pool round trips
+        and share the statement cache of one connection.
+
+        Tasks started inside the block (e.g. by `asyncio.gather`) still
+        acquire their own connections, since a connection can only run
+        one query at a time.
+
+        Example:
+        ```
+        >>> async with db.pinned_connection():
+        ...     for row in rows:
+        ...         await table.insert(row)
+        ```
+        """
+        if self._pinned.get() is not None:
+            raise RuntimeError("A connection is already pinned in this context")
+        async with self._pool.acquire() as connection:  # type: ignore[union-attr]
+            token = self._pinned.set((asyncio.current_task(), connection))  # type: ignore[arg-type]
+            try:
+                yield connection
+            finally:
+                self._pinned.reset(token)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Connection]:
+        """
+        Acquire a connection and start a transaction on it. Inside of
+        `pinned_connection`, the pinned connection is used instead.
 
-    @acquire
+        Example:
+        ```
+        >>> async with db.transaction() as cxn:
+        ...     await cxn.execute("DELETE FROM mytab WHERE a = $1", 10)
+        ...     await cxn.execute("INSERT INTO mytab (a) VALUES ($1)", 20)
+        ```
+        """
+        pinned = self._pinned.get()
+        if pinned is not None and pinned[0] is asyncio.current_task():
+            async with pinned[1].transaction():
+                yield pinned[1]
+            return
+        async with self._pool.acquire() as connection:  # type: ignore[union-attr]
+            async with connection.transaction():
+                yield connection
+
+    @acquire()
     async def execute(self, query: str, *args: Any, _cxn: Connection) -> str:
         """
         Execute an SQL command (or commands).
@@ -160,11 +351,12 @@ class Database(DatabaseABC):
 
         args: Query arguments.
         """
-        self._log.debug(f"{query} ;; {strip_args(*args)}")
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("%s ;; %s", query, strip_args(*args))
         return await _cxn.execute(query, *args)
 
     
-    @acquire
+    @acquire(transaction=False)
     async def fetch(self, query: str, *args: Any, _cxn: Connection) -> List[Record]:
         """use when making selections.
 
@@ -173,10 +365,42 @@ class Database(DatabaseABC):
         List[Record]:
             the records from the selection/return
         """
-        self._log.debug(f"{query} ;; {strip_args(*args)}")
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("%s ;; %s", query, strip_args(*args))
+        statement = self._prepared.get(_cxn.get_server_pid(), _NO_STATEMENTS).get(query)
+        if statement is not None:
+            return await statement.fetch(*args)
         return await _cxn.fetch(query, *args)
 
-    @acquire
+    @acquire(transaction=False)
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        records: Iterable[Sequence[Any]],
+        columns: Sequence[str],
+        schema_name: Optional[str] = None,
+        *,
+        _cxn: Connection,
+    ) -> str:
+        """
+        Copy records into a table with the binary COPY protocol. A single
+        COPY is atomic, so no transaction is started for it.
+
+        Returns:
+        --------
+        str:
+            the command status, e.g. 'COPY 1000'
+        """
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("COPY %s (%s)", table_name, ", ".join(columns))
+        return await _cxn.copy_records_to_table(
+            table_name,
+            records=records,
+            columns=list(columns),
+            schema_name=schema_name,
+        )
+
+    @acquire(transaction=False)
     async def fetchrow(self, query: str, *args: Any, _cxn: Connection) -> Optional[Record]:
         """use when making selections that return a single row.
 
@@ -185,5 +409,9 @@ class Database(DatabaseABC):
         Optional[Record]:
             the record from the selection/return or None
         """
-        self._log.debug(f"{query} ;; {strip_args(*args)}")
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("%s ;; %s", query, strip_args(*args))
+        statement = self._prepared.get(_cxn.get_server_pid(), _NO_STATEMENTS).get(query)
+        if statement is not None:
+            return await statement.fetchrow(*args)
         return await _cxn.fetchrow(query, *args)
\ No newline at end of file
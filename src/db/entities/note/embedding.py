@@ -1,11 +1,11 @@
 from dataclasses import dataclass
 from typing import Sequence
 
-from src.ai.embedding_generator import EmbeddingGenerator, EmbeddingGeneratorABC
+from src.ai.embedding_generator import EmbeddingGeneratorABC
 from src.api.undefined import *
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteEmbeddingEntity:
     """Represents one record of note.embedding which contains the model which craeted the embedding,
     the embedding and the note it belongs to"""
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 from datetime import datetime
 
 from asyncpg import Record
@@ -10,7 +10,7 @@ from .permission import NotePermissionEntity
 from src.api.undefined import *
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteEntity:
     """Represents one record of note.metadata"""
     note_id: UndefinedOr[int] = UNDEFINED
@@ -22,15 +22,18 @@ class NoteEntity:
     permissions: UndefinedOr[List[NotePermissionEntity]] = UNDEFINED
 
     @staticmethod
-    def from_record(record: Record | Dict[str, Any]) -> "NoteEntity":
+    def from_record(record: Record) -> "NoteEntity":
+        """Creates a NoteEntity from a record, which starts with the columns
+        `id, title, updated_at, author_id, content` in exactly this order.
+        Additional trailing columns (e.g. a rank) are ignored."""
         return NoteEntity(
-            note_id=record.get("id", UNDEFINED),
-            title=record.get("title", UNDEFINED),
-            updated_at=record.get("updated_at", UNDEFINED),
-            author_id=record.get("author_id", UNDEFINED),
-            content=record.get("content", UNDEFINED),
-            embeddings=[],
-            permissions=[]
+            record[0],
+            record[1],
+            record[2],
+            record[3],
+            record[4],
+            [],
+            [],
         )
 
     def to_grpc_dict(self) -> Dict[str, Any]:
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 from src.api.undefined import UndefinedOr
 
-@dataclass
+@dataclass(slots=True)
 class NotePermissionEntity:
     """Represents one record of note.permission"""
     note_id: UndefinedOr[int]
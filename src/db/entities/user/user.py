@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class UserEntity:
     discord_id: int
     avatar: Optional[str] = None
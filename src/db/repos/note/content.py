@@ -1,14 +1,17 @@
 from abc import ABC, abstractmethod
-from dataclasses import replace
 from typing import List, Optional
 
 from asyncpg import Record
 from src.api.undefined import UNDEFINED
 from src.db.entities import NoteEntity
-from src.db.repos.note import permission
 from src.db.table import TableABC
 
-from src.utils import asdict
+from src.utils import to_columns
+
+# `id` is aliased, so that records map directly onto NoteEntity
+RETURNING_COLUMNS = "id AS note_id, title, content, updated_at, author_id"
+# fields of NoteEntity which are stored in other tables
+NON_COLUMN_FIELDS = ("embeddings", "permissions")
 
 
 class NoteContentRepo(ABC):
@@ -32,6 +35,25 @@ class NoteContentRepo(ABC):
         """
         ...
 
+    @abstractmethod
+    async def insert_many(
+        self,
+        metadata: List[NoteEntity],
+    ) -> List[NoteEntity]:
+        """inserts multiple metadata entries in one round trip
+        
+        Args:
+        -----
+        metadata: `List[NoteEntity]`
+            the metadata of the notes
+
+        Returns:
+        --------
+        `List[NoteEntity]`:
+            the inserted entities (with IDs) in the same order
+        """
+        ...
+
     @abstractmethod
     async def update(
         self,
@@ -116,40 +138,60 @@ class NoteContentPostgresRepo(NoteContentRepo):
     """Provides an implementation using Postgres as the backend database"""
     def __init__(self, table: TableABC[List[Record]]):
         self._table = table
+        # the table name is fixed per repo, so the statement text is built once
+        self._insert_many_query = f"""
+            INSERT INTO {table.name} (title, content, updated_at, author_id)
+            SELECT title, content, updated_at, author_id
+            FROM UNNEST($1::text[], $2::text[], $3::timestamp[], $4::bigint[])
+                WITH ORDINALITY AS t(title, content, updated_at, author_id, ord)
+            ORDER BY ord
+            RETURNING {RETURNING_COLUMNS}
+            """
 
     async def insert(self, metadata: NoteEntity) -> NoteEntity:
         records = await self._table.insert(
-            asdict(metadata),
-            returning="id, title, content, updated_at, author_id"
+            to_columns(metadata, exclude=NON_COLUMN_FIELDS),
+            returning=RETURNING_COLUMNS
         )
         if not records:
             raise Exception("Failed to insert metadata")
-        record = dict(records[0])
-        record['note_id'] = record.pop('id')  # convert SQL id -> note_id for NoteEntity
-        return NoteEntity(**record)
+        return NoteEntity(**records[0])
+
+    async def insert_many(self, metadata: List[NoteEntity]) -> List[NoteEntity]:
+        if not metadata:
+            return []
+        # one INSERT over unnested column arrays instead of a round trip per row.
+        # COPY would be faster still, but it cannot return the generated IDs
+        columns = ([], [], [], [])
+        for m in metadata:
+            for column, value in zip(columns, (m.title, m.content, m.updated_at, m.author_id)):
+                column.append(None if value is UNDEFINED else value)
+        records = await self._table.fetch(
+            self._insert_many_query,
+            *columns
+        )
+        if not records or len(records) != len(metadata):
+            raise Exception("Failed to insert metadata")
+        return [NoteEntity(**record) for record in records]
 
     async def update(self, set: NoteEntity, where: NoteEntity) -> NoteEntity:
-        where_arg = asdict(where)
+        where_arg = to_columns(where, exclude=NON_COLUMN_FIELDS)
         where_arg["id"] = where_arg.pop("note_id", None)
         record = await self._table.update(
-            set=asdict(set),
+            set=to_columns(set, exclude=NON_COLUMN_FIELDS),
             where=where_arg,
-            returning="id, title, content, updated_at, author_id"
+            returning=RETURNING_COLUMNS
         )
         if not record:
             raise Exception(f"Failed to update metadata; returned: {record}")
         assert isinstance(record, Record)
-        record = dict(record)
-        record['note_id'] = record.pop('id')  # convert SQL id -> note_id for NoteEntity
         return NoteEntity(**record)
 
     async def delete(self, metadata: NoteEntity) -> Optional[List[NoteEntity]]:
         SQL_ID = self._table.get_id_fields()[0]
         ENTITY_ID = "note_id"
         # remove permissions and embeddings, since these are not in the content table
-        conditions = asdict(
-            replace(metadata, permissions=UNDEFINED, embeddings=UNDEFINED)
-        )
+        conditions = to_columns(metadata, exclude=NON_COLUMN_FIELDS)
 
         # map entities note_id to table id
         conditions[SQL_ID] = conditions.pop(ENTITY_ID, None)
@@ -158,37 +200,25 @@ class NoteContentPostgresRepo(NoteContentRepo):
             raise ValueError(f"At least one field must be set to delete metadata: {metadata}")
         records = await self._table.delete(
             where=conditions,
-            returning="id, title, content, updated_at, author_id"
+            returning=RETURNING_COLUMNS
         )
         if not records:
             raise Exception("Failed to delete metadata")
-        
-        # convert records to note entities with id conversion
-        entities = []
-        for r in records:
-            d = dict(r)
-            d[ENTITY_ID] = d.pop(SQL_ID)
-            entity = NoteEntity(**d, embeddings=[], permissions=[])
-            entities.append(entity)
-
-        return entities
+        return [NoteEntity(**r, embeddings=[], permissions=[]) for r in records]
     
     async def select(self, metadata: NoteEntity) -> List[NoteEntity]:
         records = await self._table.select(
-            where=asdict(metadata),
-            select="id, title, content, updated_at, author_id"
+            where=to_columns(metadata, exclude=NON_COLUMN_FIELDS),
+            select=RETURNING_COLUMNS
         )
         if not records:
             return []
         return [NoteEntity(**record) for record in records]
 
     async def select_by_id(self, note_id: int) -> NoteEntity:
-        record = await self._table.fetch_by_id(note_id, select="id, title, content, updated_at, author_id")
+        record = await self._table.fetch_by_id(note_id, select=RETURNING_COLUMNS)
         if not record:
             raise RuntimeError(f"Note with ID {note_id} not found")
-        # convert Record to NoteEntity (id -> note_id)
-        record = dict(record)
-        record['note_id'] = record.pop('id')
 
         # neither embeddings nor permissions are fetched here
         return NoteEntity(**record, embeddings=[], permissions=[])
\ No newline at end of file
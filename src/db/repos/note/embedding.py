@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
 
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
 from asyncpg import Record
+from torch import Tensor
+from src.ai.embedding_cache import EmbeddingCacheABC, LRUEmbeddingCache
 from src.ai.embedding_generator import EmbeddingGeneratorABC
 from src.db.entities import NoteEmbeddingEntity
 from src.db.table import TableABC
 
-from src.utils import asdict
+from src.utils import to_columns
 
 class NoteEmbeddingRepo(ABC):
 
@@ -36,6 +38,45 @@ class NoteEmbeddingRepo(ABC):
         """
         ...
 
+    @abstractmethod
+    async def insert_many(
+        self,
+        notes: Sequence[Tuple[int, str, str]],
+    ) -> List[NoteEmbeddingEntity]:
+        """generates the embeddings of multiple notes in one batch and inserts them
+        
+        Args:
+        -----
+        notes: `Sequence[Tuple[int, str, str]]`
+            `(note_id, title, content)` of each note
+
+        Returns:
+        --------
+        `List[NoteEmbeddingEntity]`:
+            the inserted embeddings in the same order
+        """
+        ...
+
+    @abstractmethod
+    async def embed(
+        self,
+        texts: Sequence[str],
+    ) -> List[Tensor]:
+        """returns the embeddings of the texts, generating only
+        the ones which are not cached yet
+        
+        Args:
+        -----
+        texts: `Sequence[str]`
+            the texts to embed, e.g. `"{title}\n{content}"` of a note
+
+        Returns:
+        --------
+        `List[Tensor]`:
+            the embeddings in the same order
+        """
+        ...
+
     @abstractmethod
     async def update(
         self,
@@ -102,21 +143,58 @@ class NoteEmbeddingRepo(ABC):
 
 class NoteEmbeddingPostgresRepo(NoteEmbeddingRepo):
     """Provides an impementation using Postgres as the backend database"""
-    def __init__(self, table: TableABC[List[Record]], embedding_generator: EmbeddingGeneratorABC):
+    def __init__(
+        self,
+        table: TableABC[List[Record]],
+        embedding_generator: EmbeddingGeneratorABC,
+        cache: Optional[EmbeddingCacheABC] = None,
+    ):
+        """
+        Args:
+        -----
+        table: `TableABC[List[Record]]`
+            the embedding table
+        embedding_generator: `EmbeddingGeneratorABC`
+            generates the embeddings of the notes
+        cache: `Optional[EmbeddingCacheABC]`
+            cache for generated embeddings, so re-inserted notes
+            (reindexing, retries, duplicates) skip the model.
+            Defaults to an in-memory LRU cache
+        """
         self._table = table
         self._embedding_generator = embedding_generator
+        self._cache = cache or LRUEmbeddingCache()
+        # the table name is fixed per repo, so the statement text is built once
+        self._insert_many_query = f"""
+            INSERT INTO {table.name} (note_id, model, embedding)
+            SELECT * FROM UNNEST($1::bigint[], $2::varchar[], $3::halfvec[])
+            RETURNING note_id, model, embedding
+            """
+
+    async def embed(self, texts: Sequence[str]) -> List[Tensor]:
+        model_name = self._embedding_generator.model_name
+        embeddings: List[Optional[Tensor]] = [self._cache.get(model_name, text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # one forward pass for all texts which are not cached
+            generated = await self._embedding_generator.agenerate([texts[i] for i in missing])
+            for i, embedding in zip(missing, generated):
+                # copy the row, so the cache does not keep the whole batch alive
+                embedding = embedding.copy()
+                self._cache.put(model_name, texts[i], embedding)
+                embeddings[i] = embedding
+        return embeddings  # type: ignore[return-value]
 
     async def insert(self, note_id: int, title: str, content: str) -> NoteEmbeddingEntity:
         # generate embedding
         embedding_content = f"{title}\n{content}"
-        embedding = self._embedding_generator.generate(embedding_content)
-        embedding_str = EmbeddingGeneratorABC.tensor_to_str_vec(embedding)
+        embedding = (await self.embed([embedding_content]))[0]
 
-        # insert embedding
+        # insert embedding; the vector codec encodes the array in binary
         record = await self._table.insert({
             "note_id": note_id,
             "model": self._embedding_generator.model_name,
-            "embedding": embedding_str,
+            "embedding": embedding,
         })
         if not record:
             raise Exception("Failed to insert embedding")
@@ -126,21 +204,48 @@ class NoteEmbeddingPostgresRepo(NoteEmbeddingRepo):
         embedding = NoteEmbeddingEntity(
             note_id=record[0]["note_id"],
             model=self._embedding_generator.model_name,
-            embedding=self.embedding_generator.str_vec_to_list(record[0]["embedding"]),
+            embedding=record[0]["embedding"],
         )
         return embedding
 
+    async def insert_many(self, notes: Sequence[Tuple[int, str, str]]) -> List[NoteEmbeddingEntity]:
+        if not notes:
+            return []
+        embeddings = await self.embed(
+            [f"{title}\n{content}" for _, title, content in notes]
+        )
+
+        # one INSERT over unnested column arrays, with one statement text
+        # for any amount of notes
+        model = self._embedding_generator.model_name
+        records = await self._table.fetch(
+            self._insert_many_query,
+            [note_id for note_id, _, _ in notes],
+            [model] * len(notes),
+            list(embeddings),
+        )
+        if not records or len(records) != len(notes):
+            raise Exception("Failed to insert embeddings")
+        return [
+            NoteEmbeddingEntity(
+                note_id=record["note_id"],
+                model=record["model"],
+                embedding=record["embedding"],
+            )
+            for record in records
+        ]
+
     async def update(self, set: NoteEmbeddingEntity, where: NoteEmbeddingEntity) -> NoteEmbeddingEntity:
         record = await self._table.update(
-            set=asdict(set),
-            where=asdict(where)
+            set=to_columns(set),
+            where=to_columns(where)
         )
         if not record:
             raise Exception("Failed to update embedding")
         return set
 
     async def delete(self, embedding: NoteEmbeddingEntity) -> NoteEmbeddingEntity:
-        conditions = asdict(embedding)
+        conditions = to_columns(embedding)
         if not conditions:
             raise ValueError(f"At least one field must be set to delete an embedding: {embedding}")
         record = await self._table.delete(
@@ -152,11 +257,13 @@ class NoteEmbeddingPostgresRepo(NoteEmbeddingRepo):
     
     async def select(self, embedding: NoteEmbeddingEntity) -> List[NoteEmbeddingEntity]:
         records = await self._table.select(
-            where=asdict(embedding)
+            where=to_columns(embedding),
+            select="note_id, model, embedding"
         )
         if not records:
             return []
-        return [NoteEmbeddingEntity(**record) for record in records]
+        # positional, in the order of the selected columns
+        return [NoteEmbeddingEntity(r[0], r[1], r[2]) for r in records]
 
     @property
     def embedding_generator(self) -> EmbeddingGeneratorABC:
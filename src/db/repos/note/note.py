@@ -1,12 +1,9 @@
 from abc import ABC, abstractmethod
-from dataclasses import replace
+import asyncio
 from enum import Enum
-from typing import List, Optional, Type
-import typing
+from typing import Dict, List, Optional, Type
 
-import asyncpg
-
-from src.ai.embedding_generator import EmbeddingGenerator, Models
+from src.ai.embedding_cache import EmbeddingCacheABC, LRUEmbeddingCache
 from src.api.types import LoggingProvider, Pagination
 from src.db.entities import NoteEntity
 from src.db import Database
@@ -15,7 +12,6 @@ from src.db.repos.note.content import NoteContentRepo
 
 from src.db.repos.note.permission import NotePermissionRepo
 from src.db.repos.note.search_strategy import ContextNoteSearchStrategy, DateNoteSearchStrategy, FuzzyTitleContentSearchStrategy, NoteSearchStrategy, WebNoteSearchStrategy
-from src.db.table import TableABC
 from src.api.undefined import UNDEFINED
 from src.db.entities.note.permission import NotePermissionEntity
 from src.db.repos.note.embedding import NoteEmbeddingRepo
@@ -69,6 +65,30 @@ class NoteRepoFacadeABC(ABC):
         """
         ...
 
+    @abstractmethod
+    async def insert_many(
+        self,
+        notes: List[NoteEntity],
+        batch_size: int = 500,
+    ) -> List[NoteEntity]:
+        """inserts multiple full notes into all 3 relations.
+        Each batch uses one statement per relation and one
+        embedding generation call.
+        
+        Args:
+        -----
+        notes: `List[NoteEntity]`
+            the notes to insert
+        batch_size: `int`
+            the amount of notes which are inserted together
+
+        Returns:
+        --------
+        `List[NoteEntity]`:
+            the updated entities (updated IDs) in the same order
+        """
+        ...
+
     @abstractmethod
     async def update(
         self,
@@ -160,6 +180,45 @@ class NoteRepoFacadeABC(ABC):
 
 
 class NoteRepoFacade(NoteRepoFacadeABC):
+    # constant query texts, so that they hit the statement cache of the connections
+    INSERT_QUERY = """
+    WITH c AS (
+        INSERT INTO note.content(title, content, updated_at, author_id)
+        VALUES ($1, $2, $3, $4)
+        RETURNING id
+    ), e AS (
+        INSERT INTO note.embedding(note_id, model, embedding)
+        SELECT c.id, $5, $6::halfvec FROM c
+        WHERE $6::halfvec IS NOT NULL
+        RETURNING model, embedding
+    )
+    SELECT c.id, e.model, e.embedding FROM c LEFT JOIN e ON TRUE
+    """
+    INSERT_WITH_PERMISSIONS_QUERY = """
+    WITH c AS (
+        INSERT INTO note.content(title, content, updated_at, author_id)
+        VALUES ($1, $2, $3, $4)
+        RETURNING id
+    ), e AS (
+        INSERT INTO note.embedding(note_id, model, embedding)
+        SELECT c.id, $5, $6::halfvec FROM c
+        WHERE $6::halfvec IS NOT NULL
+        RETURNING model, embedding
+    ), p AS (
+        INSERT INTO note.permission(note_id, role_id)
+        SELECT c.id, role_id FROM c, UNNEST($7::bigint[]) AS role_id
+    )
+    SELECT c.id, e.model, e.embedding FROM c LEFT JOIN e ON TRUE
+    """
+    # strategies are cheap to build and hold per-search state, so a new
+    # one is created per call instead of sharing instances between searches
+    SEARCH_STRATEGIES: Dict[SearchType, Type[NoteSearchStrategy]] = {
+        SearchType.NO_SEARCH: DateNoteSearchStrategy,
+        SearchType.FULL_TEXT_TITLE: WebNoteSearchStrategy,
+        SearchType.FUZZY: FuzzyTitleContentSearchStrategy,
+        SearchType.CONTEXT: ContextNoteSearchStrategy,
+    }
+
     def __init__(
         self, 
         db: Database,
@@ -167,63 +226,119 @@ class NoteRepoFacade(NoteRepoFacadeABC):
         embedding_repo: NoteEmbeddingRepo,
         permission_repo: NotePermissionRepo,
         logging_provider: LoggingProvider,
+        query_embedding_cache: Optional[EmbeddingCacheABC] = None,
     ):
+        """
+        Args:
+        -----
+        db: `Database`
+            the database the facade writes multi-relation statements to
+        content_repo: `NoteContentRepo`
+            repo of the note contents
+        embedding_repo: `NoteEmbeddingRepo`
+            repo of the note embeddings, which also provides the generator
+        permission_repo: `NotePermissionRepo`
+            repo of the note permissions
+        logging_provider: `LoggingProvider`
+            provides the logger for this instance
+        query_embedding_cache: `Optional[EmbeddingCacheABC]`
+            cache for the embeddings of context search queries.
+            Defaults to an in-memory LRU cache
+        """
         self._db = db
         self._content_repo = content_repo
         self._embedding_repo = embedding_repo
         self._permission_repo = permission_repo
         self.log = logging_provider(__name__, self)
+        self._query_embedding_cache = query_embedding_cache or LRUEmbeddingCache()
 
     
     async def insert(self, note: NoteEntity):
-        # insert note itself
-        query = f"""
-        INSERT INTO {self.content_table_name}(title, content, updated_at, author_id)
-        VALUES ($1, $2, $3, $4)
-        RETURNING id
-        """
-        note_id: int = (await self._db.fetchrow(
-            query, 
-            note.title, note.content, note.updated_at, note.author_id
-        ))["id"] 
-        self.log.debug(f"Inserted note with ID: {note_id}")
-
-        # insert embeddings
+        # the embedding has to exist before the note is written
         assert note.embeddings == [] or note.embeddings is UNDEFINED
-        note.embeddings = []
-        query = f"""
-        INSERT INTO {self.embedding_table_name}(note_id, model, embedding)
-        VALUES ($1, $2, $3)
-        """
+        embedding = None
         if note.content:
-            embedding = await self._embedding_repo.insert(
-                note_id,
-                note.title if note.title else "",
-                note.content
-            )
-            note.embeddings.append(embedding)
-
-        # insert permissions
-        query = f"""
-        INSERT INTO {self.permission_table_name}(note_id, role_id)
-        VALUES ($1, $2)
-        """
-        if isinstance(note.permissions, list):
-            for permission in note.permissions:
-                permission.note_id = note_id
-                await self._db.execute(
-                    query,
-                    note_id, permission.role_id
-                )
-        else:
+            embedding = (await self._embedding_repo.embed(
+                [f"{note.title if note.title else ''}\n{note.content}"]
+            ))[0]
+        if not isinstance(note.permissions, list):
             note.permissions = []  # to ensure it's the same value as the SQL return
+        role_ids = [permission.role_id for permission in note.permissions]
+
+        # insert content, embedding and permissions in one statement
+        query = self.INSERT_WITH_PERMISSIONS_QUERY if role_ids else self.INSERT_QUERY
+        args = [
+            note.title, note.content, note.updated_at, note.author_id,
+            self._embedding_repo.embedding_generator.model_name, embedding,
+        ]
+        if role_ids:
+            args.append(role_ids)
+        record = await self._db.fetchrow(query, *args)
+        assert record is not None
+        note_id: int = record["id"]
+        self.log.debug("Inserted note with ID: %s", note_id)
+
         note.note_id = note_id
+        note.embeddings = []
+        if record["model"] is not None:
+            note.embeddings.append(NoteEmbeddingEntity(
+                note_id=note_id,
+                model=record["model"],
+                embedding=record["embedding"],
+            ))
+        for permission in note.permissions:
+            permission.note_id = note_id
         return note
+
+    async def insert_many(self, notes: List[NoteEntity], batch_size: int = 500) -> List[NoteEntity]:
+        for start in range(0, len(notes), batch_size):
+            await self._insert_batch(notes[start:start + batch_size])
+        return notes
+
+    async def _insert_batch(self, notes: List[NoteEntity]) -> None:
+        # insert notes themselves
+        inserted = await self._content_repo.insert_many(notes)
+        for note, inserted_note in zip(notes, inserted):
+            note.note_id = inserted_note.note_id
+        self.log.debug("Inserted %d notes", len(notes))
+
+        # embeddings and permissions only depend on the note IDs,
+        # so both are inserted concurrently over separate connections
+        for note in notes:
+            assert note.embeddings == [] or note.embeddings is UNDEFINED
+            note.embeddings = []
+        with_content = [note for note in notes if note.content]
+        permissions: List[NotePermissionEntity] = []
+        for note in notes:
+            if not isinstance(note.permissions, list):
+                note.permissions = []  # to ensure it's the same value as the SQL return
+            for permission in note.permissions:
+                permission.note_id = note.note_id
+                permissions.append(permission)
+
+        insert_embeddings = self._embedding_repo.insert_many([
+            (note.note_id, note.title if note.title else "", note.content)
+            for note in with_content
+        ])
+        if permissions:
+            embeddings, _ = await asyncio.gather(
+                insert_embeddings,
+                self._permission_repo.insert_many(permissions),
+            )
+        else:
+            embeddings = await insert_embeddings
+        for note, embedding in zip(with_content, embeddings):
+            note.embeddings.append(embedding)
     
     async def update(self, note: NoteEntity, ctx: UserContext) -> NoteEntity:
         # update content
         note_entity = await self._content_repo.update(
-            set=replace(note, embeddings=UNDEFINED, permissions=UNDEFINED, note_id=UNDEFINED),
+            set=NoteEntity(
+                title=note.title,
+                content=note.content,
+                updated_at=note.updated_at,
+                author_id=note.author_id,
+            ),
             where=NoteEntity(note_id=note.note_id)
         )
 
@@ -236,27 +351,26 @@ class NoteRepoFacade(NoteRepoFacadeABC):
         return await self._content_repo.delete(NoteEntity(note_id=note_id, author_id=ctx.user_id))
     
     async def select_by_id(self, note_id: int, ctx: UserContext) -> Optional[NoteEntity]:
-        record = await self._content_repo.select_by_id(note_id)
+        # content, embeddings and permissions are independent of each other
+        record, embeddings, permissions = await asyncio.gather(
+            self._content_repo.select_by_id(note_id),
+            self._embedding_repo.select(
+                NoteEmbeddingEntity(
+                    note_id=note_id,
+                    model=UNDEFINED,
+                    embedding=UNDEFINED,
+                )
+            ),
+            self._permission_repo.select(
+                NotePermissionEntity(
+                    note_id=note_id,
+                    role_id=UNDEFINED,
+                )
+            ),
+        )
         if not record:
             return None
-        
-        # fetch embeddings
-        embeddings = await self._embedding_repo.select(
-            NoteEmbeddingEntity(
-                note_id=note_id,
-                model=UNDEFINED,
-                embedding=UNDEFINED,
-            )
-        )
         record.embeddings = embeddings
-
-        # fetch permissions
-        permissions = await self._permission_repo.select(
-            NotePermissionEntity(
-                note_id=note_id,
-                role_id=UNDEFINED,
-            )
-        )
         record.permissions = permissions
         return record
 
@@ -268,36 +382,18 @@ class NoteRepoFacade(NoteRepoFacadeABC):
         pagination: Pagination
     ) -> List[NoteEntity]:
 
-        # these parameters are common to all strategies __init__ fn
-        common_init_parameters = {
-            "db": self._db,
-            "query": query,
-            "limit": pagination.limit,
-            "offset": pagination.offset,
-            "user_id": ctx.user_id,
-        }
-        strategy: NoteSearchStrategy
-        if search_type == SearchType.NO_SEARCH:
-            strategy = DateNoteSearchStrategy(**common_init_parameters)
-        elif search_type == SearchType.FULL_TEXT_TITLE:
-            strategy = WebNoteSearchStrategy(**common_init_parameters)
-        elif search_type == SearchType.FUZZY:
-            strategy = FuzzyTitleContentSearchStrategy(**common_init_parameters)
-        elif search_type == SearchType.CONTEXT:
-            strategy = ContextNoteSearchStrategy(
-                **common_init_parameters, 
-                generator=self._embedding_repo.embedding_generator
-            )
-        else: 
+        strategy_cls = self.SEARCH_STRATEGIES.get(search_type)
+        if strategy_cls is None:
             raise ValueError(f"Unknown SearchType: {search_type}")
-
+        strategy = strategy_cls.create(
+            self._db, query, pagination, ctx.user_id,
+            generator=self._embedding_repo.embedding_generator,
+            cache=self._query_embedding_cache,
+        )
         note_entities = await strategy.search()
         return note_entities
 
 
-
-
-
-    
-
-    
\ No newline at end of file
+# prepared on every pool connection; the variant with permissions is not, since
+# preparing it would fail on databases without the note.permission relation
+Database.register_hot_queries(NoteRepoFacade.INSERT_QUERY)
@@ -1,11 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
 
 from asyncpg import Record
 from src.db.entities import NotePermissionEntity
 from src.db.table import TableABC
 
-from src.utils import asdict
+from src.utils import to_columns
 
 
 class NotePermissionRepo(ABC):
@@ -29,6 +29,25 @@ class NotePermissionRepo(ABC):
         """
         ...
 
+    @abstractmethod
+    async def insert_many(
+        self,
+        permissions: Sequence[NotePermissionEntity],
+    ) -> List[NotePermissionEntity]:
+        """inserts multiple permissions with one statement
+        
+        Args:
+        -----
+        permissions: `Sequence[NotePermissionEntity]`
+            the permissions of one or more notes
+
+        Returns:
+        --------
+        `List[NotePermissionEntity]`:
+            the inserted entities
+        """
+        ...
+
     @abstractmethod
     async def update(
         self,
@@ -94,24 +113,43 @@ class NotePermissionPostgresRepo(NotePermissionRepo):
     """Provides an implementation using Postgres as the backend database"""
     def __init__(self, table: TableABC[List[Record]]):
         self._table = table
+        # the table name is fixed per repo, so the statement text is built once
+        self._insert_many_query = f"""
+            INSERT INTO {table.name} (note_id, role_id)
+            SELECT * FROM UNNEST($1::bigint[], $2::bigint[])
+            RETURNING note_id
+            """
 
     async def insert(self, permission: NotePermissionEntity) -> NotePermissionEntity:
-        record = await self._table.insert(asdict(permission))
+        record = await self._table.insert(to_columns(permission))
         if not record:
             raise Exception("Failed to insert permission")
         return permission
 
+    async def insert_many(self, permissions: Sequence[NotePermissionEntity]) -> List[NotePermissionEntity]:
+        if not permissions:
+            return []
+        # one INSERT over unnested column arrays instead of a round trip per row
+        records = await self._table.fetch(
+            self._insert_many_query,
+            [permission.note_id for permission in permissions],
+            [permission.role_id for permission in permissions],
+        )
+        if not records or len(records) != len(permissions):
+            raise Exception("Failed to insert permissions")
+        return list(permissions)
+
     async def update(self, set: NotePermissionEntity, where: NotePermissionEntity) -> NotePermissionEntity:
         record = await self._table.update(
-            set=asdict(set),
-            where=asdict(where)
+            set=to_columns(set),
+            where=to_columns(where)
         )
         if not record:
             raise Exception("Failed to update permission")
         return set
 
     async def delete(self, permission: NotePermissionEntity) -> NotePermissionEntity:
-        conditions = asdict(permission)
+        conditions = to_columns(permission)
         if not conditions:
             raise ValueError(f"At least one field must be set to delete a permission: {permission}")
         record = await self._table.delete(
@@ -123,7 +161,7 @@ class NotePermissionPostgresRepo(NotePermissionRepo):
     
     async def select(self, permission: NotePermissionEntity) -> List[NotePermissionEntity]:
         records = await self._table.select(
-            where=asdict(permission)
+            where=to_columns(permission)
         )
         if not records:
             return []
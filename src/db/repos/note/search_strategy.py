@@ -1,16 +1,20 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Self
+from typing import Optional, Self, Tuple
 
-from asyncpg import Record
-from src.ai.embedding_generator import EmbeddingGenerator, EmbeddingGeneratorABC, Models
+from torch import Tensor
+
+from src.ai.embedding_cache import EmbeddingCacheABC
+from src.ai.embedding_generator import EmbeddingGeneratorABC, Models
+from src.api.types import Pagination
 from src.db.database import Database, DatabaseABC
 from src.db.entities import NoteEntity
-from src.db import TableABC
 
 
 class NoteSearchStrategy(ABC):
     """Represents a strategy for searching notes."""
+    # a strategy is created per search; subclasses declare their own slots
+    __slots__ = ("db", "query", "limit", "offset", "user_id")
 
     def __init__(
         self,
@@ -26,6 +30,37 @@ class NoteSearchStrategy(ABC):
         self.offset = offset
         self.user_id = user_id
 
+    @classmethod
+    def create(
+        cls,
+        db: DatabaseABC,
+        query: str,
+        pagination: Pagination,
+        user_id: int,
+        generator: EmbeddingGeneratorABC,
+        cache: Optional[EmbeddingCacheABC] = None,
+    ) -> Self:
+        """Creates the strategy for one search. All strategies share this
+        signature, so callers need not know which of the dependencies a
+        strategy uses.
+
+        Args:
+        -----
+        db: `DatabaseABC`
+            the database to search in
+        query: `str`
+            The search query.
+        pagination: `Pagination`
+            the page to return
+        user_id: `int`
+            the ID of the user whose notes are searched
+        generator: `EmbeddingGeneratorABC`
+            embeds the query, for strategies which search by embedding
+        cache: `Optional[EmbeddingCacheABC]`
+            cache for the embedding of the query
+        """
+        strategy = cls(db, query, pagination.limit, pagination.offset, user_id)
+        return strategy.set_pagination(pagination)
 
     def set_query(self, query: str) -> Self:
         """Sets the search query.
@@ -59,6 +94,19 @@ class NoteSearchStrategy(ABC):
         """
         self.offset = offset
         return self
+
+    def set_pagination(self, pagination: Pagination) -> Self:
+        """Sets the page to return. Strategies which support keyset
+        pagination also take `pagination.after`.
+
+        Args:
+        -----
+        pagination: `Pagination`
+            the page to return
+        """
+        self.limit = pagination.limit
+        self.offset = pagination.offset
+        return self
     
     @abstractmethod
     async def search(self) -> list["NoteEntity"]:
@@ -83,17 +131,63 @@ class NoteSearchStrategy(ABC):
 
 class DateNoteSearchStrategy(NoteSearchStrategy):
     """Return notes sorted by date (most recent first)."""
+    __slots__ = ("after",)
+    QUERY = """
+    SELECT id, title, updated_at, author_id, content
+    FROM note.content
+    WHERE author_id = $1
+    -- notes without a date sort first, as under a plain updated_at DESC,
+    -- but comparable in the row comparison below
+    ORDER BY COALESCE(updated_at, 'infinity') DESC, id DESC
+    LIMIT $2
+    OFFSET $3;
+    """
+    # continues after the last note of the previous page, so that deep pages
+    # do not scan and discard all notes before them like OFFSET does
+    KEYSET_QUERY = """
+    SELECT id, title, updated_at, author_id, content
+    FROM note.content
+    WHERE author_id = $1
+        AND (COALESCE(updated_at, 'infinity'), id)
+            < (COALESCE($2::timestamp, 'infinity'), $3)
+    ORDER BY COALESCE(updated_at, 'infinity') DESC, id DESC
+    LIMIT $4;
+    """
+
+    def __init__(
+        self,
+        db: DatabaseABC,
+        query: str,
+        limit: int,
+        offset: int,
+        user_id: int,
+    ) -> None:
+        super().__init__(db, query, limit, offset, user_id)
+        self.after: Optional[Tuple[Optional[datetime], int]] = None
+
+    def set_pagination(self, pagination: Pagination) -> Self:
+        """Sets the page to return. When `pagination.after` is set, the
+        page continues after that keyset cursor and the offset is ignored.
+
+        Args:
+        -----
+        pagination: `Pagination`
+            the page to return. `after` is `(updated_at, note_id)` of the
+            last note of the previous page, where `updated_at` is None
+            for notes without a date
+        """
+        super().set_pagination(pagination)
+        self.after = pagination.after
+        return self
     
     async def search(self) -> list["NoteEntity"]:
-        query = f"""
-        SELECT id, title, author_id, content, updated_at
-        FROM note.content
-        WHERE author_id = $1
-        ORDER BY updated_at DESC
-        LIMIT {self.limit}
-        OFFSET {self.offset};
-        """
-        records = await self.db.fetch(query, self.user_id)
+        if self.after is not None:
+            updated_at, note_id = self.after
+            records = await self.db.fetch(
+                self.KEYSET_QUERY, self.user_id, updated_at, note_id, self.limit
+            )
+        else:
+            records = await self.db.fetch(self.QUERY, self.user_id, self.limit, self.offset)
         if not records:
             return []
         return [NoteEntity.from_record(record) for record in records]
@@ -104,23 +198,22 @@ class WebNoteSearchStrategy(NoteSearchStrategy):
     Return notes which match by lexme or similarity in the title and content. 
     Title is also fuzzy searched
     """
+    __slots__ = ()
+    QUERY = """
+    -- the query is parsed once, as a FROM item, and reused for match and rank
+    SELECT c.id, c.title, c.updated_at, c.author_id, c.content,
+        ts_rank(c.search_vector, q.tsq) AS fts_rank
+    FROM note.content c, websearch_to_tsquery('english', $1) AS q(tsq)
+    WHERE 
+        c.author_id = $2
+        AND c.search_vector @@ q.tsq
+    ORDER BY fts_rank DESC
+    LIMIT $3
+    OFFSET $4;
+    """
     
     async def search(self) -> list["NoteEntity"]:
-        query = f"""
-        SELECT id, title, author_id, content, updated_at,
-            ts_rank(
-                to_tsvector('english', title),
-                websearch_to_tsquery('english', $1)
-            ) AS fts_rank
-        FROM note.content
-        WHERE 
-            author_id = $2
-            AND search_vector @@ websearch_to_tsquery('english', $1)
-        ORDER BY fts_rank DESC
-        LIMIT {self.limit}
-        OFFSET {self.offset};
-        """
-        records = await self.db.fetch(query, self.query, self.user_id)
+        records = await self.db.fetch(self.QUERY, self.query, self.user_id, self.limit, self.offset)
         if not records:
             raise RuntimeError("Failed to fetch notes by exact title.")
         return [NoteEntity.from_record(record) for record in records]
@@ -128,17 +221,19 @@ class WebNoteSearchStrategy(NoteSearchStrategy):
 
 class FuzzyTitleContentSearchStrategy(NoteSearchStrategy):
     """Return notes where the title or content is similar to the query"""
+    __slots__ = ()
+    QUERY = """
+    SELECT id, title, updated_at, author_id, content
+    FROM note.content
+    WHERE author_id = $2
+    -- trigram distance (1 - similarity) as KNN ordering, served by a GiST index
+    ORDER BY (title || ' ' || content) <-> $1
+    LIMIT $3
+    OFFSET $4;
+    """
     
     async def search(self) -> list["NoteEntity"]:
-        query = f"""
-        SELECT id, title, author_id, content, updated_at
-        FROM note.content
-        WHERE author_id = $2
-        ORDER BY similarity(title || ' ' || content, $1) DESC
-        LIMIT {self.limit}
-        OFFSET {self.offset};
-        """
-        records = await self.db.fetch(query, self.query, self.user_id)
+        records = await self.db.fetch(self.QUERY, self.query, self.user_id, self.limit, self.offset)
         if not records:
             raise RuntimeError("Failed to fetch notes by fuzzy title/content.")
         return [NoteEntity.from_record(record) for record in records]
@@ -146,28 +241,87 @@ class FuzzyTitleContentSearchStrategy(NoteSearchStrategy):
 
 class ContextNoteSearchStrategy(NoteSearchStrategy):
     """Return notes based on semantic search using embeddings."""
-    def __init__(self, db: DatabaseABC, query: str, limit: int, offset: int, user_id: int, generator: EmbeddingGeneratorABC) -> None:
-        super().__init__(db, query, limit, offset, user_id)
-        self.generator = generator
-
-    async def search(self) -> list["NoteEntity"]:
-        model = Models.MINI_LM_L6_V2
-        query = f"""
-        SELECT id, title, author_id, content, updated_at, (embedding <=> $1::vector) AS similarity
+    __slots__ = ("generator", "cache")
+    QUERY = """
+    -- embeddings are normalized, so the (negative) inner product orders like
+    -- the cosine distance, without computing the norms per row
+    WITH candidates AS MATERIALIZED (
+        SELECT id, title, updated_at, author_id, content, (embedding <#> $1::halfvec) AS similarity
         FROM note.embedding
         JOIN 
             note.content on note.content.id = note.embedding.note_id 
             AND note.embedding.model = $2
-            AND note.content.author_id = {self.user_id}
+            AND note.content.author_id = $3
         ORDER BY similarity ASC
-        LIMIT {self.limit}
-        OFFSET {self.offset}
-        """
-        query_embedding = self.generator.generate(self.query)
-        query_embedding_str = self.generator.tensor_to_str_vec(query_embedding)
-        start = datetime.now()
-        records = await self.db.fetch(query, query_embedding_str, model.value)
+        LIMIT $4
+        OFFSET $5
+    )
+    -- the relaxed index scan may return candidates slightly out of order
+    SELECT * FROM candidates ORDER BY similarity ASC
+    """
+    # the HNSW scan yields only hnsw.ef_search candidates over all authors,
+    # before author and model are filtered. An iterative scan continues
+    # until enough candidates of the author are found
+    ITERATIVE_SCAN = "SET LOCAL hnsw.iterative_scan = relaxed_order"
+
+    def __init__(
+        self,
+        db: DatabaseABC,
+        query: str,
+        limit: int,
+        offset: int,
+        user_id: int,
+        generator: EmbeddingGeneratorABC,
+        cache: Optional[EmbeddingCacheABC] = None,
+    ) -> None:
+        super().__init__(db, query, limit, offset, user_id)
+        self.generator = generator
+        self.cache = cache
 
+    @classmethod
+    def create(
+        cls,
+        db: DatabaseABC,
+        query: str,
+        pagination: Pagination,
+        user_id: int,
+        generator: EmbeddingGeneratorABC,
+        cache: Optional[EmbeddingCacheABC] = None,
+    ) -> Self:
+        strategy = cls(
+            db, query, pagination.limit, pagination.offset, user_id,
+            generator=generator, cache=cache,
+        )
+        return strategy.set_pagination(pagination)
+
+    async def search(self) -> list["NoteEntity"]:
+        model = Models.MINI_LM_L6_V2
+        query_embedding = await self._embed_query()
+        async with self.db.transaction() as cxn:
+            await cxn.execute(self.ITERATIVE_SCAN)
+            records = await cxn.fetch(
+                self.QUERY, query_embedding, model.value, self.user_id, self.limit, self.offset
+            )
         if not records:
-            raise RuntimeError("Failed to fetch notes by context.")
-        return [NoteEntity.from_record(record) for record in records]
\ No newline at end of file
+            return []
+        return [NoteEntity.from_record(record) for record in records]
+
+    async def _embed_query(self) -> Tensor:
+        """returns the embedding of the query, from the cache if possible,
+        since pagination and repeated searches embed the same query again"""
+        if self.cache is None:
+            return await self.generator.agenerate(self.query)
+        model_name = self.generator.model_name
+        embedding = self.cache.get(model_name, self.query)
+        if embedding is None:
+            embedding = await self.generator.agenerate(self.query)
+            self.cache.put(model_name, self.query, embedding)
+        return embedding
+
+
+Database.register_hot_queries(
+    DateNoteSearchStrategy.QUERY,
+    DateNoteSearchStrategy.KEYSET_QUERY,
+    WebNoteSearchStrategy.QUERY,
+    FuzzyTitleContentSearchStrategy.QUERY,
+)
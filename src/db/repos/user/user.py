@@ -1,10 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Optional
 
 from src.db.entities import UserEntity
 from src.db import Database
 from src.utils.logging import logging_provider
 
+USER_COLUMNS = "id, discord_id, avatar, username, discriminator, email"
+INSERT_USER = f"INSERT INTO users (discord_id, avatar, username, discriminator, email) VALUES ($1, $2, $3, $4, $5) RETURNING {USER_COLUMNS}"
+UPDATE_USER = f"UPDATE users SET discord_id = $1, avatar = $2 WHERE id = $3 RETURNING {USER_COLUMNS}"
+UPSERT_USER = f"""
+    INSERT INTO users (discord_id, avatar, username, discriminator, email) 
+    VALUES ($1, $2, $3, $4, $5) 
+    ON CONFLICT (discord_id) DO UPDATE 
+    SET avatar = $2, username = $3, discriminator = $4, email = $5
+    RETURNING {USER_COLUMNS}
+"""
+SELECT_USER_BY_ID = f"SELECT {USER_COLUMNS} FROM users WHERE id = $1"
+SELECT_USER_BY_DISCORD_ID = f"SELECT {USER_COLUMNS} FROM users WHERE discord_id = $1"
+DELETE_USER = "DELETE FROM users WHERE id = $1"
+Database.register_hot_queries(
+    INSERT_USER,
+    UPDATE_USER,
+    UPSERT_USER,
+    SELECT_USER_BY_ID,
+    SELECT_USER_BY_DISCORD_ID,
+)
+
 
 class UserRepoABC(ABC):
     @abstractmethod
@@ -40,43 +63,82 @@ class UserRepoABC(ABC):
 
 class UserPostgresRepo(UserRepoABC):
     """Provides an impementation using Postgres as the backend database"""
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache_size: int = 4096):
+        """
+        Args:
+        -----
+        db: `Database`
+            the database to operate on
+        cache_size: `int`
+            amount of users which are kept in memory for
+            `select_by_discord_id`. Entries are dropped after every write
+            of this repo, so the cache only goes stale when the users
+            table is written from outside of this repo.
+        """
         self.db = db
+        self._cache_size = cache_size
+        self._by_discord_id: OrderedDict[int, UserEntity] = OrderedDict()
+        # user ID -> discord ID, to evict by user ID
+        self._discord_ids: Dict[int, int] = {}
+        # bumped by every write, so that selections which were running
+        # during a write do not cache the user as it was before
+        self._write_generation = 0
+
+    def _cache_put(self, user: UserEntity) -> None:
+        if user.id is None:
+            return
+        self._cache_evict(user.id)
+        self._by_discord_id[user.discord_id] = replace(user)
+        self._discord_ids[user.id] = user.discord_id
+        if len(self._by_discord_id) > self._cache_size:
+            _, evicted = self._by_discord_id.popitem(last=False)
+            self._discord_ids.pop(evicted.id, None)  # type: ignore[arg-type]
+
+    def _cache_evict(self, user_id: int) -> None:
+        discord_id = self._discord_ids.pop(user_id, None)
+        if discord_id is not None:
+            self._by_discord_id.pop(discord_id, None)
+
+    def _written(self, user_id: Optional[int]) -> None:
+        """drops the cached user after a write committed"""
+        self._write_generation += 1
+        if user_id is not None:
+            self._cache_evict(user_id)
 
     async def insert(self, user: UserEntity) -> UserEntity:
         """Insert a new user and return the created entity with ID."""
-        query = "INSERT INTO users (discord_id, avatar, username, discriminator, email) VALUES ($1, $2, $3, $4, $5) RETURNING id"
-        user_id = await self.db.fetchrow(query, user.discord_id, user.avatar, user.username, user.discriminator, user.email)
-        user.id = user_id["id"]
-        return user
+        row = await self.db.fetchrow(INSERT_USER, user.discord_id, user.avatar, user.username, user.discriminator, user.email)
+        if not row:
+            raise Exception(f"Failed to insert user; returned: {row}")
+        inserted = UserEntity(**row)
+        user.id = inserted.id
+        self._written(inserted.id)
+        return inserted
 
     async def update(self, user: UserEntity) -> UserEntity:
         """Update an existing user."""
         if user.id is None:
             raise ValueError("User ID is required for update operation")
-        query = "UPDATE users SET discord_id = $1, avatar = $2 WHERE id = $3 RETURNING *"
-        ret = await self.db.fetchrow(query, user.discord_id, user.avatar, user.id)
+        ret = await self.db.fetchrow(UPDATE_USER, user.discord_id, user.avatar, user.id)
         if not ret:
             raise Exception(f"Failed to update user; returned: {ret}")
-        return UserEntity(**ret)
+        user = UserEntity(**ret)
+        self._written(user.id)
+        return user
 
     async def upsert(self, user: UserEntity) -> UserEntity:
         """Insert or update a user based on discord_id."""
-        query = """
-            INSERT INTO users (discord_id, avatar, username, discriminator, email) 
-            VALUES ($1, $2, $3, $4, $5) 
-            ON CONFLICT (discord_id) DO UPDATE 
-            SET avatar = $2, username = $3, discriminator = $4, email = $5
-            RETURNING id
-        """
-        user_id = await self.db.fetchrow(query, user.discord_id, user.avatar, user.username, user.discriminator, user.email)
-        user.id = user_id
-        return user
+        row = await self.db.fetchrow(UPSERT_USER, user.discord_id, user.avatar, user.username, user.discriminator, user.email)
+        if not row:
+            raise Exception(f"Failed to upsert user; returned: {row}")
+        upserted = UserEntity(**row)
+        user.id = upserted.id
+        self._written(upserted.id)
+        return upserted
 
     async def select(self, user_id: int) -> Optional[UserEntity]:
         """Select a user by ID."""
-        query = "SELECT id, discord_id, avatar, username, discriminator, email FROM users WHERE id = $1"
-        row = await self.db.fetchrow(query, user_id)
+        row = await self.db.fetchrow(SELECT_USER_BY_ID, user_id)
         if row:
             return UserEntity(
                 id=row["id"],
@@ -90,10 +152,15 @@ class UserPostgresRepo(UserRepoABC):
 
     async def select_by_discord_id(self, discord_id: int) -> Optional[UserEntity]:
         """Select a user by discord_id."""
-        query = "SELECT id, discord_id, avatar, username, discriminator, email FROM users WHERE discord_id = $1"
-        row = await self.db.fetchrow(query, discord_id)
+        cached = self._by_discord_id.get(discord_id)
+        if cached is not None:
+            self._by_discord_id.move_to_end(discord_id)
+            # copy, so that callers can not modify the cached entity
+            return replace(cached)
+        generation = self._write_generation
+        row = await self.db.fetchrow(SELECT_USER_BY_DISCORD_ID, discord_id)
         if row:
-            return UserEntity(
+            user = UserEntity(
                 id=row["id"],
                 discord_id=row["discord_id"],
                 avatar=row["avatar"],
@@ -101,10 +168,13 @@ class UserPostgresRepo(UserRepoABC):
                 discriminator=row["discriminator"],
                 email=row["email"]
             )
+            if generation == self._write_generation:
+                self._cache_put(user)
+            return user
         return None
 
     async def delete(self, user_id: int) -> bool:
         """Delete a user by ID."""
-        query = "DELETE FROM users WHERE id = $1"
-        result = await self.db.execute(query, user_id)
+        result = await self.db.execute(DELETE_USER, user_id)
+        self._written(user_id)
         return result == "DELETE 1"
@@ -1,7 +1,10 @@
-from typing import Any, Callable, Generic, List, Optional, Dict, Sequence, TypeVar, cast, Protocol, runtime_checkable, Union
+from typing import Any, AsyncIterator, Callable, Generic, List, Optional, Dict, Sequence, Tuple, TypeVar, cast, Protocol, Union
 from collections import OrderedDict
+from contextlib import asynccontextmanager
 from functools import wraps, update_wrapper
 from abc import ABC, abstractmethod
+import asyncio
+import time
 import traceback
 import logging
 import typing
@@ -9,7 +12,7 @@ import typing
 import pandas as pd
 from pandas import DataFrame
 import asyncpg
-from asyncpg import Record
+from asyncpg import Connection, Record
 
 from src.api.types import LoggingProvider
 from src.db.database import Database
@@ -17,20 +20,29 @@ from src.utils import asdict, drop_undefined
 
 TReturn = TypeVar('TReturn', List[Record], pd.DataFrame, covariant=True)
 log: Optional[logging.Logger] = None
+MAX_QUERY_ARGS = 32767  # bind parameters asyncpg accepts per statement
+SQL_CACHE_SIZE = 256  # statement shapes per table whose SQL text is kept
+SELECT_CACHE_SIZE = 1024  # selections per table whose records are kept
 
 def with_log(reraise_exc: bool = True):
+    """
+    Logs the statement of the wrapped coroutine and its result or error.
+
+    Args:
+        reraise_exc: raise errors again after logging them.
+    """
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             self = args[0]
             try:
                 return_value = await func(*args, **kwargs)
-                if self.do_log and log is not None:
-                    log.debug(f"{self._executed_sql}\n->{return_value}")
+                if log is not None and self.do_log:
+                    log.debug("SQL:\n%s\nWITH VALUES: %s\n->%s", *self._executed_sql, return_value)
                 return return_value
             except Exception as e:
                 if self._error_logging and log is not None:
-                    log.error(f"{self._executed_sql}")
+                    log.error("SQL:\n%s\nWITH VALUES: %s", *self._executed_sql)
                     log.exception(f"{traceback.format_exc()}")
                     if reraise_exc:
                         raise e
@@ -39,32 +51,37 @@ def with_log(reraise_exc: bool = True):
         return wrapper
     return decorator
 
-def formatter(func: Callable):
+def invalidates_selections(func: Callable):
+    """drops the cached selections of the table after the wrapped
+    coroutine ran, since it might have changed rows"""
     @wraps(func)
-    async def wrapper(*args, **kwargs):
-        self = args[0]
-        return_value = await func(*args, **kwargs)
-        if self._as_dataframe:
-
-            columns: List[str] = []
-            if isinstance(return_value, list):
-                if len(return_value) > 0:
-                    columns = [k for k in return_value[0].keys()]
-                else:
-                    columns = []
-            elif isinstance(return_value, dict):
-                columns = [k for k in return_value.keys()]
-            else:
-                raise TypeError(f"{type(return_value)} is not supported. Only list and dict can be converted to dataframe.")
-            return_value = pd.DataFrame(data=return_value, columns=columns)  # type: ignore
-        return return_value
-    update_wrapper(wrapper, func)
+    async def wrapper(self: "Table", *args, **kwargs):
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self._invalidate_selections()
     return wrapper
 
+def first_row(frame: pd.DataFrame) -> Dict[str, Any]:
+    """returns the first row of a DataFrame as dict of native Python values,
+    without building a Series for it"""
+    return dict(zip(frame.columns, frame.to_numpy(dtype=object)[0].tolist()))
+
+def records_to_dataframe(records: List[Record]) -> pd.DataFrame:
+    """converts the list of records of a query into a DataFrame"""
+    if not records:
+        return pd.DataFrame(data=[], columns=[])
+    # column-wise construction; pandas would otherwise infer
+    # the types of the list of records cell by cell
+    columns = [k for k in records[0].keys()]
+    # records iterate over their values, so zip transposes rows to columns
+    frame = pd.DataFrame(dict(enumerate(zip(*records))), copy=False)
+    frame.columns = columns  # positional, keeps duplicate names
+    return frame
+
 
 
 
-@runtime_checkable
 class TableABC(Protocol, Generic[TReturn]):
     """Abstract base class defining the interface for database table operations.
     
@@ -118,7 +135,8 @@ class TableABC(Protocol, Generic[TReturn]):
         
         Args:
             where: Dictionary mapping column names to values, or DataFrame with
-                columns as field names and rows as records to insert.
+                columns as field names and rows as records to insert. All rows
+                of a DataFrame are inserted with one multi-row statement.
             returning: Columns to return from the inserted row. Defaults to '*'.
             on_conflict: ON CONFLICT clause (e.g., 'DO NOTHING'). Defaults to empty.
         
@@ -132,6 +150,86 @@ class TableABC(Protocol, Generic[TReturn]):
         """
         ...
     
+    async def insert_many(
+        self,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        returning: str = "*",
+        on_conflict: str = "",
+    ) -> List[Record]:
+        """Insert many rows with a single statement.
+        
+        The rows are transposed into one array per column and inserted
+        with INSERT ... SELECT * FROM UNNEST(...), so the statement text
+        is the same for any amount of rows.
+        
+        Args:
+            columns: The column names, in the order of the row values.
+            rows: The values of each row.
+            returning: Columns to return from the inserted rows. Defaults to '*'.
+            on_conflict: ON CONFLICT clause (e.g., 'DO NOTHING'). Defaults to empty.
+        
+        Returns:
+            The inserted records as specified by the returning parameter.
+        
+        Raises:
+            ValueError: If a row does not have one value per column.
+        
+        Example:
+            >>> await table.insert_many(['name', 'age'], [('Alice', 30), ('Bob', 25)])
+        """
+        ...
+    
+    async def copy_from_dataframe(
+        self,
+        rows: pd.DataFrame,
+        on_conflict: str = "",
+    ) -> str:
+        """Insert all rows of a DataFrame with the binary COPY protocol.
+        
+        Faster than `insert` for large amounts of rows, since the rows are
+        streamed instead of bound as parameters of a parsed statement.
+        Nothing is returned from the inserted rows.
+        
+        Args:
+            rows: DataFrame with columns as field names and rows as records
+                to insert.
+            on_conflict: ON CONFLICT clause (e.g., 'DO NOTHING'). COPY itself
+                has no conflict handling, so the rows are then copied into a
+                temporary table and inserted from there.
+        
+        Returns:
+            The command status, e.g. 'COPY 1000' or 'INSERT 0 1000'.
+        
+        Example:
+            >>> await table.copy_from_dataframe(df)
+            >>> await table.copy_from_dataframe(df, on_conflict='DO NOTHING')
+        """
+        ...
+    
+    async def copy_records(
+        self,
+        records: Sequence[Sequence[Any]],
+        columns: Sequence[str],
+    ) -> str:
+        """Insert rows given as tuples with the binary COPY protocol.
+        
+        The fastest way to bulk load rows, e.g. for imports, since no
+        statement is parsed or planned per row. There is no RETURNING and
+        no ON CONFLICT handling; a conflicting row fails the whole COPY.
+        
+        Args:
+            records: Rows to insert, each with one value per column.
+            columns: Names of the columns, in the order of the values.
+        
+        Returns:
+            The command status, e.g. 'COPY 1000'.
+        
+        Example:
+            >>> await table.copy_records([(1, 'Alice'), (2, 'Bob')], ['id', 'name'])
+        """
+        ...
+    
     async def upsert(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
@@ -156,6 +254,28 @@ class TableABC(Protocol, Generic[TReturn]):
         """
         ...
     
+    async def bulk_upsert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        returning: str = "",
+    ) -> List[List[Record]]:
+        """Upsert multiple rows concurrently.
+        
+        Like upsert(), but each row runs on its own pool connection, so the
+        round trips of the rows overlap. All rows must have the same columns.
+        
+        Args:
+            rows: Dictionaries mapping column names to values.
+            returning: Columns to return. Defaults to empty (no return).
+        
+        Returns:
+            The returned records of each row, in the order of rows.
+        
+        Example:
+            >>> await table.bulk_upsert([{'id': 1, 'age': 31}, {'id': 2, 'age': 40}])
+        """
+        ...
+    
     async def update(
         self, 
         set: Dict[str, Any], 
@@ -185,6 +305,36 @@ class TableABC(Protocol, Generic[TReturn]):
         """
         ...
     
+    async def bulk_update(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        key: Sequence[str],
+        returning: str = "",
+    ) -> List[Record]:
+        """Update multiple records, each with its own values, at once.
+        
+        Executes one UPDATE ... FROM UNNEST(...) statement with one array
+        per column instead of one UPDATE per record. All rows must have
+        the same columns.
+        
+        Args:
+            rows: Dictionaries mapping column names to values. The key
+                columns select the record, all other columns are set.
+            key: Columns which identify the record to update.
+            returning: Columns to return from updated rows. Defaults to
+                empty (no return).
+        
+        Returns:
+            The returned records of all updated rows.
+        
+        Example:
+            >>> await table.bulk_update(
+            ...     [{'id': 1, 'age': 32}, {'id': 2, 'age': 41}],
+            ...     key=['id']
+            ... )
+        """
+        ...
+    
     async def delete(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
@@ -214,6 +364,7 @@ class TableABC(Protocol, Generic[TReturn]):
         order_by: Optional[str] = None, 
         select: str = "*",
         additional_values: Optional[List] = None,
+        limit: Optional[int] = None,
     ) -> Optional[TReturn]:
         """Select records from the table with filtering and ordering.
         
@@ -226,6 +377,7 @@ class TableABC(Protocol, Generic[TReturn]):
             select: Columns to select. Defaults to '*'.
             additional_values: Additional parameterized values to append
                 to WHERE conditions (for complex queries).
+            limit: Maximum number of records to return. Defaults to all.
         
         Returns:
             List of selected records as dictionaries, or DataFrame if
@@ -247,7 +399,7 @@ class TableABC(Protocol, Generic[TReturn]):
     ) -> Optional[Record]:
         """Select a single row from the table.
         
-        Convenience method that calls select() and returns only the first record.
+        Selects with LIMIT 1 and fetches only that row.
         
         Args:
             where: Dictionary mapping column names to filter values, or DataFrame
@@ -339,7 +491,7 @@ class TableABC(Protocol, Generic[TReturn]):
         return await self.fetch(sql, *args)
     
     @staticmethod
-    def create_where_statement(columns: List[str], dollar_start: int = 1) -> str:
+    def create_where_statement(columns: Sequence[str], dollar_start: int = 1) -> str:
         """Create a parameterized WHERE clause from column names.
         
         Generates a WHERE clause string with AND conditions for each column,
@@ -362,10 +514,11 @@ class TableABC(Protocol, Generic[TReturn]):
         ...
     
     def _create_sql_log_message(self, sql: str, values: List[Any]) -> None:
-        """Create formatted SQL log message for debugging.
+        """Remember the SQL query for debugging.
         
-        Stores the SQL query and parameter values in a formatted string
-        for use in debug logging and error messages.
+        Stores the SQL query and parameter values for use in debug logging
+        and error messages. They are only formatted when a message is
+        actually emitted.
         
         Args:
             sql: The SQL query string.
@@ -409,6 +562,7 @@ class Table(TableABC):
         db: Database,
         error_log: bool = True,
         id_fields: Optional[List[str]] = None,
+        cache_ttl: Optional[float] = None,
     ):
         """Initialize the Table instance.
         
@@ -419,23 +573,59 @@ class Table(TableABC):
             error_log: Enable error logging. Defaults to True.
             id_fields: List of column names that form the table's identifier.
                 Used by delete_by_id() and fetch_by_id() methods.
+            cache_ttl: Seconds for which the records of a select() are
+                reused for the same statement and values. Writes through
+                this table drop all cached selections; writes from
+                elsewhere become visible after the TTL. Defaults to None
+                (no caching).
         """
 
         self.name = table_name
         self.db = db
         self.log = logging_provider(__name__, self)
-        self.do_log = self.log.level == logging.DEBUG
         self.id_fields = id_fields or []
-        self._executed_sql = ""
+        self._executed_sql: Tuple[str, Sequence[Any]] = ("", ())
         self._as_dataframe: bool = False
         self._error_logging = error_log
+        # (operation, columns, clauses...) -> SQL text
+        self._sql_cache: OrderedDict[tuple, str] = OrderedDict()
+        self._cache_ttl = cache_ttl
+        # (sql, *values) -> (monotonic time of the selection, records)
+        self._select_cache: OrderedDict[tuple, Tuple[float, List[Record]]] = OrderedDict()
+        # bumped by every write, so that selections which were running
+        # during a write do not store their possibly outdated records
+        self._write_generation = 0
+        # column name -> SQL type, loaded on first use
+        self._column_types: Optional[Dict[str, str]] = None
     
     def get_id_fields(self) -> List[str]:
         return self.id_fields
 
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator["TablePipeline"]:
+        """Runs all statements of the current task on one connection until
+        the block exits. See `Database.pinned_connection`.
+
+        Writes can additionally be buffered on the yielded `TablePipeline`
+        and are sent with `commit()`. Buffered writes which were not
+        committed are sent when the block exits without an error.
+
+        Example:
+            >>> async with table.pipeline() as p:
+            ...     for row in rows:
+            ...         p.insert(row)
+            ...     p.delete({'id': 3})
+            ...     await p.commit()
+        """
+        async with self.db.pinned_connection() as connection:
+            pipeline = TablePipeline(self, connection)
+            yield pipeline
+            await pipeline.commit()
+
     def return_as_dataframe(self, b: bool) -> None:
         self._as_dataframe = b
 
+    @invalidates_selections
     async def insert(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
@@ -455,28 +645,158 @@ class Table(TableABC):
         returning: str = "*",
         on_conflict: str = "",
     ) -> Optional[List[Record]]:
-        # Convert DataFrame to dict-like format
         if isinstance(where, pd.DataFrame):
-            # For now, handle single row DataFrame
-            if len(where) != 1:
-                raise ValueError("DataFrame must contain exactly one row for insert")
-            where = dict(where.iloc[0])
-        
-        which_columns = list(where.keys())
-        values = list(where.values())
-
-        values_chain = [f'${num}' for num in range(1, len(values)+1)]
-        sql = (
-            f"INSERT INTO {self.name} ({', '.join(which_columns)})\n"
-            f"VALUES ({', '.join(values_chain)})\n" 
-        )
-        if on_conflict:
-            sql += f"ON CONFLICT {on_conflict}\n"
-        if returning:
-            sql += f"RETURNING {returning}\n"
+            return await self._insert_dataframe_batched(where, returning, on_conflict)
+        sql, values = self._insert_statement(where, returning, on_conflict)
+        self._create_sql_log_message(sql, values)
         return_values = await self.db.fetch(sql, *values)
         return return_values
 
+    def _insert_statement(
+        self,
+        where: Dict[str, Any],
+        returning: str,
+        on_conflict: str,
+    ) -> Tuple[str, List[Any]]:
+        """Builds the SQL text and the values of a single row insert."""
+        # sorted, so that the same columns always produce the same SQL text
+        which_columns = tuple(sorted(where))
+        values = [where[column] for column in which_columns]
+
+        def build() -> str:
+            values_chain = [f'${num}' for num in range(1, len(values)+1)]
+            sql = (
+                f"INSERT INTO {self.name} ({', '.join(which_columns)})\n"
+                f"VALUES ({', '.join(values_chain)})\n" 
+            )
+            if on_conflict:
+                sql += f"ON CONFLICT {on_conflict}\n"
+            if returning:
+                sql += f"RETURNING {returning}\n"
+            return sql
+        sql = self._cached_sql(("insert", which_columns, on_conflict, returning), build)
+        return sql, values
+
+    async def _insert_dataframe_batched(
+        self,
+        rows: pd.DataFrame,
+        returning: str = "*",
+        on_conflict: str = "",
+    ) -> List[Record]:
+        """Inserts all rows of a DataFrame with one multi-row INSERT per
+        batch, instead of one statement per row. A batch is bounded by the
+        32767 bind parameters asyncpg allows per statement. All batches
+        run in one transaction, so either all rows or none are inserted."""
+        if len(rows.columns) == 0:
+            raise ValueError("DataFrame must contain at least one column for insert")
+        if rows.empty:
+            raise ValueError("DataFrame must contain at least one row for insert")
+        which_columns = [str(column) for column in rows.columns]
+        # object dtype boxes numpy scalars into Python values for asyncpg
+        values = rows.to_numpy(dtype=object).ravel(order="C").tolist()
+        batch_size = MAX_QUERY_ARGS // len(which_columns)
+
+        return_values: List[Record] = []
+        async with self.db.transaction() as cxn:
+            for start in range(0, len(rows), batch_size):
+                n_rows = min(batch_size, len(rows) - start)
+                sql = (
+                    f"INSERT INTO {self.name} ({', '.join(which_columns)})\n"
+                    f"VALUES {self.__class__.create_values_statement(n_rows, len(which_columns))}\n"
+                )
+                if on_conflict:
+                    sql += f"ON CONFLICT {on_conflict}\n"
+                if returning:
+                    sql += f"RETURNING {returning}\n"
+                batch = values[start * len(which_columns):(start + n_rows) * len(which_columns)]
+                self._create_sql_log_message(sql, [f"{n_rows} rows"])
+                return_values.extend(await cxn.fetch(sql, *batch))
+        return return_values
+
+    @invalidates_selections
+    @with_log()
+    async def insert_many(
+        self,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        returning: str = "*",
+        on_conflict: str = "",
+    ) -> List[Record]:
+        if not rows:
+            return []
+        columns = tuple(columns)
+        for row in rows:
+            if len(row) != len(columns):
+                raise ValueError(f"Row {row!r} does not have one value for each of the columns {columns}")
+        types = await self._get_column_types()
+
+        def build() -> str:
+            arrays = ", ".join(f"${i}::{types[column]}[]" for i, column in enumerate(columns, 1))
+            sql = (
+                f"INSERT INTO {self.name} ({', '.join(columns)})\n"
+                f"SELECT * FROM UNNEST({arrays})\n"
+            )
+            if on_conflict:
+                sql += f"ON CONFLICT {on_conflict}\n"
+            if returning:
+                sql += f"RETURNING {returning}\n"
+            return sql
+        sql = self._cached_sql(("insert_many", columns, on_conflict, returning), build)
+        self._create_sql_log_message(sql, [f"{len(rows)} rows"])
+        arrays = [list(values) for values in zip(*rows)]
+        return await self.db.fetch(sql, *arrays)
+
+    @invalidates_selections
+    @with_log()
+    async def copy_from_dataframe(
+        self,
+        rows: pd.DataFrame,
+        on_conflict: str = "",
+    ) -> str:
+        which_columns = [str(column) for column in rows.columns]
+        # object dtype boxes numpy scalars into Python values for asyncpg
+        records = list(zip(*(rows[column].to_numpy(dtype=object) for column in rows.columns)))
+        table_name = self.name.rpartition(".")[2]
+        self._create_sql_log_message(f"COPY {self.name} ({', '.join(which_columns)})", [f"{len(records)} rows"])
+
+        if not on_conflict:
+            return await self._copy_records(records, which_columns)
+        async with self.db.transaction() as cxn:
+            # COPY has no conflict handling; stage the rows in a temporary
+            # table with only the copied columns and without constraints
+            staging = f"_copy_{table_name}"
+            await cxn.execute(
+                f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS\n"
+                f"SELECT {', '.join(which_columns)} FROM {self.name} WITH NO DATA"
+            )
+            await cxn.copy_records_to_table(staging, records=records, columns=which_columns)
+            return await cxn.execute(
+                f"INSERT INTO {self.name} ({', '.join(which_columns)})\n"
+                f"SELECT {', '.join(which_columns)} FROM {staging}\n"
+                f"ON CONFLICT {on_conflict}"
+            )
+
+    @invalidates_selections
+    @with_log()
+    async def copy_records(
+        self,
+        records: Sequence[Sequence[Any]],
+        columns: Sequence[str],
+    ) -> str:
+        self._create_sql_log_message(f"COPY {self.name} ({', '.join(columns)})", [f"{len(records)} rows"])
+        return await self._copy_records(records, columns)
+
+    async def _copy_records(
+        self,
+        records: Sequence[Sequence[Any]],
+        columns: Sequence[str],
+    ) -> str:
+        schema, _, table_name = self.name.rpartition(".")
+        return await self.db.copy_records_to_table(
+            table_name, records, columns, schema_name=schema or None
+        )
+
+    @invalidates_selections
     async def upsert(self, where: Dict[str, Any] | pd.DataFrame, returning: str = "") -> Optional[Union[List[Record], Record, str]]:
         return await self._upsert(
             where=where,
@@ -492,19 +812,55 @@ class Table(TableABC):
         if isinstance(where, pd.DataFrame):
             if len(where) != 1:
                 raise ValueError("DataFrame must contain exactly one row for upsert")
-            where = dict(where.iloc[0])
+            where = first_row(where)
         
-        which_columns = list(where.keys())
+        which_columns = tuple(where)
         values = list(where.values())
         
         assert values and which_columns
-        values_chain = [f'${num}' for num in range(1, len(values)+1)]
-        update_set_query = ""
-        for i, item in enumerate(zip(which_columns, values_chain)):
-            if i == 0:
-                continue
-            update_set_query += f"{item[0]}={item[1]}, "
-        update_set_query = update_set_query[:-2]  # remove last ","
+        sql = self._create_upsert_statement(which_columns, returning)
+        return_values = await self.db.fetch(sql, *values)
+        return return_values   
+
+    @invalidates_selections
+    async def bulk_upsert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        returning: str = "",
+    ) -> List[List[Record]]:
+        """Upserts rows which all have the same columns. Each row is a
+        statement on its own pool connection, so the round trips overlap
+        instead of adding up. At most as many rows as the pool has
+        connections are in flight at once.
+
+        Returns:
+            The records returned for each row, in the order of `rows`.
+        """
+        if not rows:
+            return []
+        which_columns = tuple(rows[0])
+        assert which_columns
+        sql = self._create_upsert_statement(which_columns, returning)
+        limit = asyncio.Semaphore(self.db.max_pool_size)
+
+        async def upsert_one(row: Dict[str, Any]) -> List[Record]:
+            async with limit:
+                return await self.db.fetch(sql, *(row[column] for column in which_columns))
+
+        return list(await asyncio.gather(*(upsert_one(row) for row in rows)))
+
+    def _create_upsert_statement(self, which_columns: Sequence[str], returning: str) -> str:
+        return self._cached_sql(
+            ("upsert", which_columns, returning),
+            lambda: self._build_upsert_statement(which_columns, returning),
+        )
+
+    def _build_upsert_statement(self, which_columns: Sequence[str], returning: str) -> str:
+        values_chain = [f'${num}' for num in range(1, len(which_columns)+1)]
+        # the first column is the conflict target when there are no id_fields
+        update_set_query = ", ".join(
+            f"{column}={placeholder}" for column, placeholder in zip(which_columns[1:], values_chain[1:])
+        )
         
         # Use id_fields from dependency injection
         id_fields = self.get_id_fields()
@@ -518,9 +874,9 @@ class Table(TableABC):
         )
         if returning:
             sql += f"RETURNING {returning} \n"
-        return_values = await self.db.fetch(sql, *values)
-        return return_values   
+        return sql
     
+    @invalidates_selections
     async def update(
         self, 
         set: Dict[str, Any], 
@@ -539,22 +895,79 @@ class Table(TableABC):
         where: Dict[str, Any],
         returning: str = "*"
     ) -> Optional[List[Record]]:
-        where = drop_undefined(where)  # removes UNDEFINED values
-        num_gen = (num for num in range(1,100))
-        update_set_query = ", ".join([f'{col_name}=${i}' for i, col_name in zip(num_gen, set.keys())])
-        next_ = next(num_gen) -1  # otherwise it would be one to high - python bug?
-        sql = (
-            f"UPDATE {self.name} \n"
-            f"SET {update_set_query} \n"
-            f"WHERE {self.__class__.create_where_statement([*where.keys()], dollar_start=next_)}\n"
-        )
-        if returning:
-            sql += f"RETURNING {returning} \n"
-        values = [*set.values(), *where.values()]
+        sql, values = self._update_statement(set, where, returning)
         return_values = await self.db.fetchrow(sql, *values)
-        self.log.error(f"Update returned: {return_values}")
         return return_values   
 
+    def _update_statement(
+        self,
+        set: Dict[str, Any],
+        where: Dict[str, Any],
+        returning: str,
+    ) -> Tuple[str, List[Any]]:
+        """Builds the SQL text and the values of an update."""
+        where = drop_undefined(where)  # removes UNDEFINED values
+        set_columns = tuple(set)
+        where_columns = tuple(where)
+
+        def build() -> str:
+            update_set_query = ", ".join(f"{column}=${i}" for i, column in enumerate(set_columns, 1))
+            sql = (
+                f"UPDATE {self.name} \n"
+                f"SET {update_set_query} \n"
+                f"WHERE {self.__class__.create_where_statement(where_columns, dollar_start=len(set_columns) + 1)}\n"
+            )
+            if returning:
+                sql += f"RETURNING {returning} \n"
+            return sql
+        sql = self._cached_sql(("update", set_columns, where_columns, returning), build)
+        return sql, [*set.values(), *where.values()]
+
+    @invalidates_selections
+    @with_log()
+    async def bulk_update(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        key: Sequence[str],
+        returning: str = "",
+    ) -> List[Record]:
+        if not rows:
+            return []
+        which_columns = tuple(rows[0])
+        set_columns = [column for column in which_columns if column not in key]
+        if not set_columns or len(set_columns) + len(key) != len(which_columns):
+            raise ValueError(f"Rows need all key columns {key} and at least one other column")
+        # one typed array per column, so that any amount of rows is one
+        # atomic statement with one SQL text
+        types = await self._get_column_types()
+
+        def build() -> str:
+            arrays = ", ".join(f"${i}::{types[column]}[]" for i, column in enumerate(which_columns, 1))
+            sql = (
+                f"UPDATE {self.name} AS t\n"
+                f"SET {', '.join(f'{column}=v.{column}' for column in set_columns)}\n"
+                f"FROM UNNEST({arrays}) AS v({', '.join(which_columns)})\n"
+                f"WHERE {' AND '.join(f't.{column}=v.{column}' for column in key)}\n"
+            )
+            if returning:
+                sql += f"RETURNING {returning}\n"
+            return sql
+        sql = self._cached_sql(("bulk_update", which_columns, tuple(key), returning), build)
+        self._create_sql_log_message(sql, [f"{len(rows)} rows"])
+        arrays = [[row[column] for row in rows] for column in which_columns]
+        return await self.db.fetch(sql, *arrays)
+
+    async def _get_column_types(self) -> Dict[str, str]:
+        if self._column_types is None:
+            records = await self.db.fetch(
+                "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute\n"
+                "WHERE attrelid = $1::regclass AND attnum > 0 AND NOT attisdropped",
+                self.name,
+            )
+            self._column_types = {record[0]: record[1] for record in records}
+        return self._column_types
+
+    @invalidates_selections
     async def delete(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
@@ -570,26 +983,38 @@ class Table(TableABC):
         where: Dict[str, Any] | pd.DataFrame,
         returning: str = "*"
     ) -> Optional[List[Record]]:
+        sql, matching_values = self._delete_statement(where, returning)
+        records = await self.db.fetch(sql, *matching_values)
+        return records
+
+    def _delete_statement(
+        self,
+        where: Dict[str, Any] | pd.DataFrame,
+        returning: str,
+    ) -> Tuple[str, List[Any]]:
+        """Builds the SQL text and the values of a delete."""
         # Convert DataFrame to dict if needed
         if isinstance(where, pd.DataFrame):
             if len(where) != 1:
                 raise ValueError("DataFrame must contain exactly one row for delete")
-            where = dict(where.iloc[0])
+            where = first_row(where)
         
-        columns = list(where.keys())
-        matching_values = list(where.values())
-        where_stmt = self.__class__.create_where_statement(columns)
+        # sorted, so that the same columns always produce the same SQL text
+        columns = tuple(sorted(where))
+        matching_values = [where[column] for column in columns]
 
-        sql = (
-            f"DELETE FROM {self.name}\n"
-            f"WHERE {where_stmt}\n"
-            f"RETURNING {returning}\n"
-        )
-        records = await self.db.fetch(sql, *matching_values)
-        return records
+        def build() -> str:
+            sql = (
+                f"DELETE FROM {self.name}\n"
+                f"WHERE {self.__class__.create_where_statement(columns)}\n"
+            )
+            if returning:
+                sql += f"RETURNING {returning}\n"
+            return sql
+        sql = self._cached_sql(("delete", columns, returning), build)
+        return sql, matching_values
 
     @with_log()
-    @formatter
     async def alter(self):
         pass
 
@@ -600,42 +1025,37 @@ class Table(TableABC):
         order_by: Optional[str] = None, 
         select: str = "*",
         additional_values: Optional[List] = None,
+        limit: Optional[int] = None,
     ) -> Optional[List[Record]]:
         return await self._select(
             where=where,
             order_by=order_by,
             select=select,
-            additional_values=additional_values
+            additional_values=additional_values,
+            limit=limit,
         )
     
     @with_log()
-    @formatter
     async def _select(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
         order_by: Optional[str] = None, 
         select: str = "*",
         additional_values: Optional[List] = None,
+        limit: Optional[int] = None,
     ) -> Optional[List[Record]]:
-        # Convert DataFrame to dict if needed
-        if isinstance(where, pd.DataFrame):
-            if len(where) != 1:
-                raise ValueError("DataFrame must contain exactly one row for select")
-            where = dict(where.iloc[0])
-        
-        columns = list(where.keys())
-        matching_values = list(where.values())
-        where_stmt = self.__class__.create_where_statement(columns)
-        sql = (
-            f"SELECT {select} FROM {self.name}\n"
-            f"WHERE {where_stmt}"
+        sql, matching_values = self._select_statement(
+            where, order_by, select, additional_values, limit
         )
-        if order_by:
-            sql += f"\nORDER BY {order_by}"
-        if additional_values:
-            matching_values.extend(additional_values)
-            
-        records = await self.db.fetch(sql, *matching_values)
+        self._create_sql_log_message(sql, matching_values)
+        if self._cache_ttl is not None:
+            records = await self._cached_select(sql, matching_values)
+        else:
+            records = await self.db.fetch(sql, *matching_values)
+        # formatted inline, to not pay for an additional coroutine on
+        # every selection
+        if self._as_dataframe:
+            return records_to_dataframe(records)  # type: ignore[return-value]
         return records
 
     async def select_row(
@@ -647,16 +1067,55 @@ class Table(TableABC):
             where=where,
             select=select
         )
+
+    @with_log()
     async def _select_row(
         self, 
         where: Dict[str, Any] | pd.DataFrame,
         select: str = "*"
     ) -> Optional[Record]:
+        sql, matching_values = self._select_statement(where, None, select, None, 1)
+        self._create_sql_log_message(sql, matching_values)
+        if self._cache_ttl is not None:
+            # share the cached selections instead of bypassing them
+            records = await self._cached_select(sql, matching_values)
+            return records[0] if records else None
+        # the server stops after the first match and only one row is decoded
+        return await self.db.fetchrow(sql, *matching_values)
 
-        records = await self.select(where, select=select)
-        if not records:
-            return None
-        return records[0]
+    def _select_statement(
+        self,
+        where: Dict[str, Any] | pd.DataFrame,
+        order_by: Optional[str],
+        select: str,
+        additional_values: Optional[List],
+        limit: Optional[int],
+    ) -> Tuple[str, List[Any]]:
+        """Builds the SQL text and the values of a selection."""
+        # Convert DataFrame to dict if needed
+        if isinstance(where, pd.DataFrame):
+            if len(where) != 1:
+                raise ValueError("DataFrame must contain exactly one row for select")
+            where = first_row(where)
+        
+        # sorted, so that the same columns always produce the same SQL text
+        columns = tuple(sorted(where))
+        matching_values = [where[column] for column in columns]
+
+        def build() -> str:
+            sql = (
+                f"SELECT {select} FROM {self.name}\n"
+                f"WHERE {self.__class__.create_where_statement(columns)}"
+            )
+            if order_by:
+                sql += f"\nORDER BY {order_by}"
+            if limit is not None:
+                sql += f"\nLIMIT {int(limit)}"
+            return sql
+        sql = self._cached_sql(("select", columns, select, order_by, limit), build)
+        if additional_values:
+            matching_values.extend(additional_values)
+        return sql, matching_values
 
     async def delete_by_id(self, *id_values: Any) -> Optional[Record]:
         """Delete a single record by its identifier.
@@ -685,11 +1144,9 @@ class Table(TableABC):
             raise ValueError(f"Expected {len(self.id_fields)} id values, got {len(id_values)}")
         
         where = dict(zip(self.id_fields, id_values))
-        rec = await self.select(where=where, select=select)
-        if not rec:
-            return None
-        return rec[0]
+        return await self.select_row(where=where, select=select)
 
+    @invalidates_selections
     async def fetch(self, sql: str, *args) -> Optional[List[Record]]:
         return await self._fetch(
             sql,
@@ -697,27 +1154,132 @@ class Table(TableABC):
         )
 
     @with_log()
-    @formatter
     async def _fetch(self, sql: str, *args) -> Optional[List[Record]]:
-        return await self.db.fetch(sql, *args)
+        self._create_sql_log_message(sql, args)
+        records = await self.db.fetch(sql, *args)
+        if self._as_dataframe:
+            return records_to_dataframe(records)  # type: ignore[return-value]
+        return records
+
+    async def _cached_select(self, sql: str, values: List[Any]) -> List[Record]:
+        """Returns the records of a selection, from the cache while they
+        are younger than the TTL. Selections with unhashable values
+        (e.g. lists) are not cached."""
+        key = (sql, *values)
+        try:
+            cached = self._select_cache.get(key)
+        except TypeError:
+            return await self.db.fetch(sql, *values)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._cache_ttl:  # type: ignore[operator]
+            self._select_cache.move_to_end(key)
+            return list(cached[1])
+        generation = self._write_generation
+        records = await self.db.fetch(sql, *values)
+        if generation != self._write_generation:
+            return list(records)
+        self._select_cache[key] = (now, records)
+        self._select_cache.move_to_end(key)
+        if len(self._select_cache) > SELECT_CACHE_SIZE:
+            self._select_cache.popitem(last=False)
+        return list(records)
+
+    def _invalidate_selections(self) -> None:
+        """drops the cached selections and marks running ones as outdated"""
+        self._write_generation += 1
+        self._select_cache.clear()
+
+    def _cached_sql(self, key: tuple, build: Callable[[], str]) -> str:
+        """Returns the SQL text for a statement shape, building it only on
+        the first use. Equal shapes thereby also share one text, which is
+        what the prepared statement cache of the connections is keyed by."""
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            sql = build()
+            self._sql_cache[key] = sql
+            if len(self._sql_cache) > SQL_CACHE_SIZE:
+                self._sql_cache.popitem(last=False)
+        else:
+            self._sql_cache.move_to_end(key)
+        return sql
 
     @staticmethod
-    def create_where_statement(columns: List[str], dollar_start: int = 1) -> str:
-        where = ""
-        for i, item in zip(range(dollar_start, dollar_start+len(columns)+1),columns):
-            where += f"{'AND ' if i > 0 else ''}{item}=${i} "
-        return where[4:]  # cut first and
+    def create_where_statement(columns: Sequence[str], dollar_start: int = 1) -> str:
+        return " AND ".join(f"{column}=${i}" for i, column in enumerate(columns, dollar_start))
     
-    def _create_sql_log_message(self, sql:str, values: List):
-        self._executed_sql = (
-            f"SQL:\n"
-            f"{sql}\n"
-            f"WITH VALUES: {values}"
+    @staticmethod
+    def create_values_statement(n_rows: int, n_columns: int, dollar_start: int = 1) -> str:
+        """Creates the placeholder tuples `($1, $2), ($3, $4), ...` of a
+        multi-row VALUES list with `n_rows` rows of `n_columns` values each."""
+        return ", ".join(
+            "(" + ", ".join(f"${dollar_start + row * n_columns + col}" for col in range(n_columns)) + ")"
+            for row in range(n_rows)
         )
+    
+    @property
+    def do_log(self) -> bool:
+        """whether debug messages are emitted. Asked on every call, so that
+        level changes at runtime are picked up"""
+        return self.log.isEnabledFor(logging.DEBUG)
+
+    def _create_sql_log_message(self, sql:str, values: Sequence[Any]):
+        # only stored; the message is formatted by the logger if it is emitted
+        self._executed_sql = (sql, values)
 
     async def execute(self, sql: str, *args) -> Optional[List[Record]]:
         return await self.fetch(sql, *args)
 
+class TablePipeline:
+    """Buffers inserts, updates and deletes of a table and sends them on
+    `commit()`, in one transaction on the pinned connection of
+    `Table.pipeline()`.
+
+    Consecutive statements with the same SQL text are sent with one
+    `executemany`, whose argument sets are pipelined instead of waiting
+    for the result of each row. Nothing is returned from the statements.
+    """
+    def __init__(self, table: Table, connection: Connection):
+        self._table = table
+        self._connection = connection
+        # (sql, argument sets) in the order the statements were added
+        self._statements: List[Tuple[str, List[Sequence[Any]]]] = []
+
+    def __len__(self) -> int:
+        return sum(len(args) for _, args in self._statements)
+
+    def _add(self, sql: str, values: Sequence[Any]) -> None:
+        if self._statements and self._statements[-1][0] == sql:
+            self._statements[-1][1].append(values)
+        else:
+            self._statements.append((sql, [values]))
+
+    def insert(self, where: Dict[str, Any], on_conflict: str = "") -> None:
+        """Buffers an insert of one row. See `Table.insert`."""
+        self._add(*self._table._insert_statement(where, "", on_conflict))
+
+    def update(self, set: Dict[str, Any], where: Dict[str, Any]) -> None:
+        """Buffers an update. See `Table.update`."""
+        self._add(*self._table._update_statement(set, where, ""))
+
+    def delete(self, where: Dict[str, Any]) -> None:
+        """Buffers a delete. See `Table.delete`."""
+        self._add(*self._table._delete_statement(where, ""))
+
+    async def commit(self) -> None:
+        """Sends all buffered statements. When one fails, none of them
+        is applied and the buffer is dropped nevertheless."""
+        statements, self._statements = self._statements, []
+        if not statements:
+            return
+        try:
+            async with self._connection.transaction():
+                for sql, args in statements:
+                    self._table._create_sql_log_message(sql, [f"{len(args)} rows"])
+                    await self._connection.executemany(sql, args)
+        finally:
+            self._table._invalidate_selections()
+
+
 def setup_table_logging(logging_provider: LoggingProvider):
     global log
     log = logging_provider(__name__, "decorator")
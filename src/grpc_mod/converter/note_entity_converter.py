@@ -55,16 +55,15 @@ def to_grpc_minimal_note(note_entity: NoteEntity) -> MinimalNote:
     assert note_entity.content is not None
     assert note_entity.author_id is not None
 
-    basic_args = drop_undefined(
-        drop_except_keys(
-            asdict(note_entity), 
-            {"note_id", "title", "content", "author_id", "updated_at"}
-        )
+    # built from the attributes directly; this runs once per streamed search
+    # result, and asdict would deep copy the whole entity first
+    return MinimalNote(
+        id=note_entity.note_id,
+        title=note_entity.title,
+        author_id=note_entity.author_id,
+        updated_at=note_entity.updated_at,
+        stripped_content=note_entity.content,
     )
-    basic_args["id"] = basic_args.pop("note_id")
-    basic_args["stripped_content"] = basic_args.pop("content")
-
-    return MinimalNote(**basic_args)
 
 
 def to_search_type(proto_value: GetSearchNotesRequest.SearchType.ValueType) ->  SearchType:
@@ -85,7 +85,7 @@ class GrpcNoteService(NoteServiceServicer):
                 ),
                 UserContext(user_id=request.author_id)
             )
-            self.log.debug(f"Updated note entity: {note_entity}")
+            self.log.debug("Updated note entity: %s", note_entity)
             return to_grpc_note(note_entity)
         except Exception:
             self.log.error(f"Error updating note: {traceback.format_exc()}")
@@ -172,7 +172,7 @@ class GrpcUserService(UserServiceServicer):
                     email=request.email,
                 )
             )
-            self.log.debug(f"Created user entity: {user_entity}")
+            self.log.debug("Created user entity: %s", user_entity)
             return to_grpc_user(user_entity)
         except asyncpg.UniqueViolationError:
             context.set_code(grpc.StatusCode.ALREADY_EXISTS)
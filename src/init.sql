@@ -41,6 +41,16 @@ CREATE INDEX IF NOT EXISTS idx_note_content_trgm
 ON note.content 
 USING GIN (content gin_trgm_ops);
 
+-- Trigram KNN ordering (<->) for the fuzzy search over title and content
+CREATE INDEX IF NOT EXISTS note_content_title_content_trgm_idx
+ON note.content
+USING GIST ((title || ' ' || content) gist_trgm_ops);
+
+-- every search is scoped to one author; also serves the newest-first listing,
+-- which sorts notes without updated_at first, like updated_at DESC does
+CREATE INDEX IF NOT EXISTS note_content_author_updated_idx
+ON note.content (author_id, COALESCE(updated_at, 'infinity'::timestamp) DESC, id DESC);
+
 -- Full text search index
 CREATE INDEX IF NOT EXISTS note_content_search_idx
 ON note.content
@@ -50,10 +60,28 @@ USING GIN (search_vector);
 CREATE TABLE IF NOT EXISTS note.embedding (
     note_id BIGINT NOT NULL REFERENCES note.content(id) ON DELETE CASCADE ON UPDATE CASCADE,
     model VARCHAR(128),
-    embedding VECTOR(384), -- size of output of text-embedding-3-small model 
+    embedding HALFVEC(384), -- size of output of text-embedding-3-small model 
     PRIMARY KEY(note_id, model)
 );
 
+-- embeddings are stored in FP16; migrate columns created as FP32 vector
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'note' AND table_name = 'embedding'
+            AND column_name = 'embedding' AND udt_name = 'vector'
+    ) THEN
+        ALTER TABLE note.embedding ALTER COLUMN embedding TYPE HALFVEC(384);
+    END IF;
+END $$;
+
+-- approximate nearest neighbour index for the context search, which orders
+-- by inner product (<#>) on normalized embeddings
+CREATE INDEX IF NOT EXISTS note_embedding_hnsw_idx
+ON note.embedding
+USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64);
+
 -- available permissions
 CREATE TABLE IF NOT EXISTS role.permission (
     id BIGINT PRIMARY KEY,
@@ -1,7 +1,12 @@
 import logging
 from logging import getLogger, basicConfig
+import os
 import sys
 
+# has to be set before torch is imported (sentence_transformers imports it);
+# growing segments instead of fixed blocks reduces fragmentation on CUDA
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
 import asyncio
 from typing import Optional, Callable
 import grpc
@@ -62,15 +67,16 @@ async def serve():
 
     # setup note repo via DI
     log.info("Setting up NoteRepoFacade, sub repos and embedding generator...")
+    embedding_generator = EmbeddingGenerator(
+        model_name=Models.MINI_LM_L6_V2, 
+        logging_provider=logging_provider
+    )
     repo: NoteRepoFacade = NoteRepoFacade(
         db=db,
         content_repo=NoteContentPostgresRepo(content_table),
         embedding_repo=NoteEmbeddingPostgresRepo(
             table=embedding_table,
-            embedding_generator=EmbeddingGenerator(
-                model_name=Models.MINI_LM_L6_V2, 
-                logging_provider=logging_provider
-            )
+            embedding_generator=embedding_generator,
         ),
         permission_repo=NotePermissionPostgresRepo(permission_table),
         logging_provider=logging_provider,
@@ -93,7 +99,10 @@ async def serve():
 
     # Start the server
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        embedding_generator.close()
 
 
 if __name__ == "__main__":
@@ -1,3 +1,3 @@
-from .convert import asdict
+from .convert import asdict, to_columns
 from .dict_helper import drop_undefined, drop_except_keys
 from .logging import logging_provider
\ No newline at end of file
@@ -1,5 +1,6 @@
 from dataclasses import fields, is_dataclass, MISSING
-from typing import Any, Dict, Tuple
+from functools import cache
+from typing import Any, Collection, Dict, Tuple
 from src.api.undefined import UNDEFINED, UndefinedOr, UndefinedNoneOr
 
 
@@ -34,6 +35,43 @@ def asdict(obj: Any, *, dict_factory: type = dict) -> Dict[str, Any]:
     return _asdict_inner(obj, dict_factory)
 
 
+@cache
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Returns the field names of a dataclass type, computed once per type."""
+    return tuple(field.name for field in fields(cls))
+
+
+def to_columns(obj: Any, exclude: Collection[str] = ()) -> Dict[str, Any]:
+    """Convert a dataclass instance to a flat column dictionary in one pass.
+    
+    Unlike `asdict`, nested values are not converted. Fields with UNDEFINED
+    values and fields listed in `exclude` are omitted. This is meant for
+    building the values or conditions of a single table row.
+    
+    Args:
+        obj: A dataclass instance to convert.
+        exclude: Field names which should never be part of the result.
+    
+    Returns:
+        A dictionary of the set, non-excluded fields.
+    
+    Example:
+    ```py
+    note = NoteEntity(note_id=1, title="t", permissions=[])
+    to_columns(note, exclude=("permissions",))
+    {'note_id': 1, 'title': 't'}
+    ```
+    """
+    result = {}
+    for name in _field_names(type(obj)):
+        if name in exclude:
+            continue
+        value = getattr(obj, name)
+        if value is not UNDEFINED:
+            result[name] = value
+    return result
+
+
 def _asdict_inner(obj: Any, dict_factory: type) -> Any:
     """Recursively convert dataclass to dict, handling nested dataclasses."""
     if is_dataclass(obj):
@@ -99,6 +99,7 @@ def note_repo_facade(db: Database) -> NoteRepoFacadeABC:
             )
         ),
         permission_repo=NotePermissionPostgresRepo(permission_table),
+        logging_provider=logging_provider,
     )
     return repo
 
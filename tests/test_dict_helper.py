@@ -6,7 +6,7 @@ import pytest
 from src.api import UNDEFINED
 from src.api.undefined import UndefinedNoneOr
 from src.utils.dict_helper import drop_undefined, drop_except_keys
-from src.utils.convert import asdict
+from src.utils.convert import asdict, to_columns
 
 
 def construct_test_dict() -> Dict[str, Any]:
@@ -94,3 +94,25 @@ def test_none_field_persists():
     d = asdict(test_user)
 
     assert d["age"] is None
+
+
+# -------------------------
+# to_columns tests
+# -------------------------
+
+def test_to_columns_drops_undefined():
+    test_user = User("paul", UNDEFINED)
+
+    assert to_columns(test_user) == {"name": "paul"}
+
+
+def test_to_columns_keeps_none():
+    test_user = User("paul", None)
+
+    assert to_columns(test_user) == {"name": "paul", "age": None}
+
+
+def test_to_columns_excludes_fields():
+    test_user = User("paul", 22)
+
+    assert to_columns(test_user, exclude=("age",)) == {"name": "paul"}
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.ai.embedding_cache import LRUEmbeddingCache
+from src.db.repos.note.embedding import NoteEmbeddingPostgresRepo
+from src.db.table import Table
+from src.utils import logging_provider
+
+
+def test_cache_hit_and_miss():
+    cache = LRUEmbeddingCache(maxsize=2)
+    embedding = np.ones(3)
+    assert cache.get("model", "query") is None
+    cache.put("model", "query", embedding)
+    assert cache.get("model", "query") is embedding
+    # the model is part of the key
+    assert cache.get("other-model", "query") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LRUEmbeddingCache(maxsize=2)
+    cache.put("model", "a", np.zeros(1))
+    cache.put("model", "b", np.zeros(1))
+    # touch "a", so that "b" is the least recently used one
+    assert cache.get("model", "a") is not None
+    cache.put("model", "c", np.zeros(1))
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") is not None
+    assert cache.get("model", "c") is not None
+
+
+def test_cache_clear():
+    cache = LRUEmbeddingCache()
+    cache.put("model", "a", np.zeros(1))
+    cache.clear()
+    assert cache.get("model", "a") is None
+
+
+class CountingGenerator:
+    """generates constant embeddings and counts the embedded texts"""
+    model_name = "model"
+
+    def __init__(self):
+        self.generated: list[str] = []
+
+    async def agenerate(self, text):
+        texts = [text] if isinstance(text, str) else text
+        self.generated.extend(texts)
+        return np.ones((len(texts), 3), dtype=np.float16)
+
+
+async def test_embedding_repo_generates_cached_content_once():
+    generator = CountingGenerator()
+    cache = LRUEmbeddingCache()
+    # the table is not queried, since only the generation is tested
+    table = Table("note.embedding", logging_provider, db=None)  # type: ignore[arg-type]
+    repo = NoteEmbeddingPostgresRepo(table=table, embedding_generator=generator, cache=cache)  # type: ignore[arg-type]
+    await repo.embed(["title\ncontent"])
+    embeddings = await repo.embed(["title\ncontent", "other\ncontent"])
+    assert len(embeddings) == 2
+    # only the new text reached the model
+    assert generator.generated == ["title\ncontent", "other\ncontent"]
+    # cached rows do not keep the generated batch alive
+    assert cache.get("model", "other\ncontent").base is None
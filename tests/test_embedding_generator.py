@@ -0,0 +1,83 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+import src.ai.embedding_generator as embedding_generator
+from src.ai.embedding_generator import EmbeddingGenerator, Models
+from src.utils import logging_provider
+
+
+class FakeModel:
+    """encodes each text as a vector filled with its length and
+    records the batches it was called with"""
+    def __init__(self, name: str, device: str):
+        self.batches: List[List[str]] = []
+
+    def eval(self):
+        pass
+
+    def half(self):
+        pass
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        self.batches.append(list(texts))
+        return np.array([[len(text)] * 3 for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def generator(monkeypatch: pytest.MonkeyPatch):
+    # no model has to be downloaded to test the batching around it
+    monkeypatch.setattr(embedding_generator, "SentenceTransformer", FakeModel)
+    generator = EmbeddingGenerator(
+        Models.MINI_LM_L6_V2, logging_provider, batch_size=4, max_batch_delay=0.01
+    )
+    generator.model.batches.clear()  # drop the warm-up pass
+    yield generator
+    generator.close()
+
+
+async def test_submit_coalesces_concurrent_texts(generator: EmbeddingGenerator):
+    """Concurrent submits are encoded in one batch, and every caller gets
+    the row of its own text"""
+    texts = ["a", "bb", "ccc"]
+    embeddings = await asyncio.gather(*(generator.submit(text) for text in texts))
+    assert generator.model.batches == [texts]
+    assert [int(embedding[0]) for embedding in embeddings] == [1, 2, 3]
+
+
+async def test_submit_flushes_full_batch(generator: EmbeddingGenerator):
+    """batch_size pending texts are flushed without waiting for the delay"""
+    texts = [str(i) for i in range(6)]
+    await asyncio.gather(*(generator.submit(text) for text in texts))
+    assert generator.model.batches == [texts[:4], texts[4:]]
+
+
+async def test_submit_propagates_errors(generator: EmbeddingGenerator, monkeypatch: pytest.MonkeyPatch):
+    """An error of the batch is raised to every waiting caller"""
+    def fail(texts):
+        raise ValueError("model failed")
+    monkeypatch.setattr(generator, "generate", fail)
+    results = await asyncio.gather(
+        *(generator.submit(text) for text in ["a", "b"]), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_close_fails_pending_texts(generator: EmbeddingGenerator):
+    """Texts which were not flushed yet fail once the generator is closed"""
+    pending = asyncio.ensure_future(generator.submit("a"))
+    await asyncio.sleep(0)
+    generator.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        await pending
+
+
+def test_str_vec_to_list():
+    assert EmbeddingGenerator.str_vec_to_list("[1.0,2.5,-3]") == [1.0, 2.5, -3.0]
+    assert EmbeddingGenerator.str_vec_to_list("[]") == []
+    with pytest.raises(ValueError):
+        EmbeddingGenerator.str_vec_to_list("[1.0,abc,3.0]")
+    with pytest.raises(ValueError):
+        EmbeddingGenerator.str_vec_to_list("[1.0,,3.0]")
@@ -36,6 +36,32 @@ async def test_create_note(db: Database, note_repo_facade: NoteRepoFacadeABC, us
     log.debug(f"Created note: {ret_note}; expected: {test_note}")
     assert ret_note == test_note
 
+async def test_create_many_notes(db: Database, note_repo_facade: NoteRepoFacadeABC, user_repo: UserRepoABC, test_user: UserEntity):
+    """Creates a test user, and creates multiple notes in small batches for this user"""
+    user = await user_repo.insert(test_user)
+    assert user.id
+    ctx = UserContext(user_id=user.id)
+
+    updated_at = datetime(2024, 1, 1, 12, 0, 0)
+    test_notes = [
+        NoteEntity(
+            title=f"Test Note {i}", 
+            content=f"This is test note number {i}.", 
+            updated_at=updated_at, 
+            author_id=user.id
+        )
+        for i in range(5)
+    ]
+    ret_notes = await note_repo_facade.insert_many(test_notes, batch_size=2)
+    assert len(ret_notes) == len(test_notes)
+    assert len({note.note_id for note in ret_notes}) == len(test_notes)  # all IDs are unique
+
+    for ret_note in ret_notes:
+        assert isinstance(ret_note.note_id, int)
+        assert len(ret_note.embeddings) == 1
+        # inserted note should equal the selected one
+        assert await note_repo_facade.select_by_id(note_id=ret_note.note_id, ctx=ctx) == ret_note
+
 async def test_update_note(db: Database, note_repo_facade: NoteRepoFacadeABC, user_repo: UserRepoABC, test_user: UserEntity):
     """Creates a test user, and creates a note for this user"""
     user = await user_repo.insert(test_user)
@@ -157,6 +183,50 @@ async def test_search_by_context(
         negative_search=True
     ) == True
 
+async def test_search_by_context_with_other_authors(
+    db: Database,
+    note_repo_facade: NoteRepoFacadeABC, 
+    user_repo: UserRepoABC,
+    test_user: UserEntity
+):
+    """The notes of a user are found by context, even if more than
+    `hnsw.ef_search` notes of another user are closer to the query"""
+    user = await user_repo.insert(test_user)
+    other_user = await user_repo.insert(replace(test_user, discord_id=test_user.discord_id + 1))
+    assert user.id and other_user.id
+
+    await note_repo_facade.insert_many([
+        NoteEntity(
+            title="Pasta", 
+            content=f"How to cook pasta, recipe number {i}.", 
+            updated_at=datetime.now(), 
+            author_id=other_user.id
+        )
+        for i in range(60)
+    ])
+    for content in ["Watering tomatoes in summer.", "Pruning apple trees.", "Planting tulip bulbs."]:
+        await note_repo_facade.insert(NoteEntity(
+            title="Garden", 
+            content=content, 
+            updated_at=datetime.now(), 
+            author_id=user.id
+        ))
+
+    async with db.pinned_connection() as connection:
+        # small tables are scanned sequentially, which would not use the index
+        await connection.execute("SET enable_seqscan = off")
+        try:
+            search_results = await note_repo_facade.search_notes(
+                search_type=SearchType.CONTEXT,
+                query="cooking pasta recipe",
+                pagination=Pagination(limit=3, offset=0),
+                ctx=UserContext(user_id=user.id)
+            )
+        finally:
+            await connection.execute("RESET enable_seqscan")
+    assert len(search_results) == 3
+    assert all(note.author_id == user.id for note in search_results)
+
 async def test_search_by_web_lexme_matching(
     note_repo_facade: NoteRepoFacadeABC, 
     user_repo: UserRepoABC,
@@ -314,3 +384,104 @@ async def test_search_no_filter(
     assert search_results[1].content == "Second note content."
     assert search_results[0].content == "Third note content."
 
+
+async def test_search_no_filter_keyset_pagination(
+    note_repo_facade: NoteRepoFacadeABC, 
+    user_repo: UserRepoABC,
+    test_user: UserEntity
+):
+    """Pages through the notes of a user by date, continuing each page
+    after the last note of the previous one"""
+    user = await user_repo.insert(test_user)
+    assert user.id
+
+    for day in range(1, 6):
+        await note_repo_facade.insert(NoteEntity(
+            title=f"Note {day}", 
+            content=f"Note of day {day}.", 
+            updated_at=datetime(2024, 1, day), 
+            author_id=user.id
+        ))
+
+    titles = []
+    after = None
+    while True:
+        page = await note_repo_facade.search_notes(
+            search_type=SearchType.NO_SEARCH,
+            query="",
+            pagination=Pagination(limit=2, offset=0, after=after),
+            ctx=UserContext(user_id=user.id)
+        )
+        if not page:
+            break
+        titles.extend(note.title for note in page)
+        last = page[-1]
+        assert last.updated_at and isinstance(last.note_id, int)
+        after = (last.updated_at, last.note_id)
+    assert titles == [f"Note {day}" for day in range(5, 0, -1)]
+
+
+async def test_search_no_filter_keyset_pagination_without_date(
+    note_repo_facade: NoteRepoFacadeABC, 
+    user_repo: UserRepoABC,
+    test_user: UserEntity
+):
+    """Notes without updated_at are listed before the dated ones, with
+    OFFSET and keyset pagination alike, and the cursor of such a note
+    still continues with the next page"""
+    user = await user_repo.insert(test_user)
+    assert user.id
+
+    for title, updated_at in [
+        ("Undated 1", None),
+        ("Dated", datetime(2024, 1, 1)),
+        ("Undated 2", None),
+    ]:
+        await note_repo_facade.insert(NoteEntity(
+            title=title, 
+            content=f"{title} content.", 
+            updated_at=updated_at, 
+            author_id=user.id
+        ))
+
+    titles = []
+    after = None
+    while True:
+        page = await note_repo_facade.search_notes(
+            search_type=SearchType.NO_SEARCH,
+            query="",
+            pagination=Pagination(limit=1, offset=0, after=after),
+            ctx=UserContext(user_id=user.id)
+        )
+        if not page:
+            break
+        titles.extend(note.title for note in page)
+        last = page[-1]
+        assert isinstance(last.note_id, int)
+        after = (last.updated_at, last.note_id)
+    # undated notes by descending id
+    assert titles == ["Undated 2", "Undated 1", "Dated"]
+
+    page = await note_repo_facade.search_notes(
+        search_type=SearchType.NO_SEARCH,
+        query="",
+        pagination=Pagination(limit=3, offset=0),
+        ctx=UserContext(user_id=user.id)
+    )
+    assert [note.title for note in page] == titles
+
+
+def test_search_strategies_created_from_pagination():
+    """Every strategy is built through the same factory, which passes the
+    whole pagination on, including the keyset cursor"""
+    after = (datetime(2024, 1, 1), 1)
+    pagination = Pagination(limit=2, offset=4, after=after)
+    for search_type, strategy_cls in NoteRepoFacade.SEARCH_STRATEGIES.items():
+        strategy = strategy_cls.create(
+            None, "query", pagination, 1,  # type: ignore[arg-type]
+            generator=None,  # type: ignore[arg-type]
+        )
+        assert isinstance(strategy, strategy_cls)
+        assert (strategy.limit, strategy.offset) == (2, 4)
+        if search_type is SearchType.NO_SEARCH:
+            assert strategy.after == after
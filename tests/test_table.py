@@ -0,0 +1,259 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pandas as pd
+import pytest
+
+from src.db.repos import Database
+from src.db.table import Table
+from src.utils import logging_provider
+
+# import fixtures, otherise pytest will not detect them
+from .fixtures import db, dsn
+
+
+def role_table(db: Database, **kwargs) -> Table:
+    return Table(
+        table_name="role.role",
+        logging_provider=logging_provider,
+        db=db,
+        id_fields=["id"],
+        error_log=True,
+        **kwargs,
+    )
+
+
+async def test_bulk_update(db: Database):
+    """Updates rows with different values in one statement"""
+    table = role_table(db)
+    for i in range(3):
+        await table.insert({"id": i, "name": f"role {i}", "description": None})
+    updated = await table.bulk_update(
+        [{"id": 0, "name": "admin"}, {"id": 2, "name": "guest"}],
+        key=["id"],
+        returning="id, name",
+    )
+    assert sorted((r["id"], r["name"]) for r in updated) == [(0, "admin"), (2, "guest")]
+    rows = await table.fetch("SELECT name FROM role.role ORDER BY id")
+    assert rows and [r["name"] for r in rows] == ["admin", "role 1", "guest"]
+
+
+async def test_pinned_connection(db: Database):
+    """Queries inside a pinned block run on the pinned connection"""
+    table = role_table(db)
+    async with db.pinned_connection() as connection:
+        await table.insert({"id": 1, "name": "admin"})
+        row = await table.select_row({"id": 1})
+        assert row and row["name"] == "admin"
+        pid = await db.fetchrow("SELECT pg_backend_pid() AS pid")
+        assert pid and pid["pid"] == connection.get_server_pid()
+
+
+async def test_copy_records(db: Database):
+    """Copies rows given as tuples into the table"""
+    table = role_table(db)
+    status = await table.copy_records([(1, "admin"), (2, "guest")], ["id", "name"])
+    assert status == "COPY 2"
+    rows = await table.fetch("SELECT id, name FROM role.role ORDER BY id")
+    assert rows and [(r["id"], r["name"]) for r in rows] == [(1, "admin"), (2, "guest")]
+
+
+async def test_copy_records_in_pinned_transaction(db: Database):
+    """COPY runs on the pinned connection, so it is rolled back with
+    the transaction opened on it"""
+    table = role_table(db)
+    async with db.pinned_connection():
+        try:
+            async with db.transaction():
+                await table.copy_records([(1, "admin")], ["id", "name"])
+                rows = await table.fetch("SELECT id FROM role.role")
+                assert rows and len(rows) == 1
+                raise RuntimeError("rollback")
+        except RuntimeError:
+            pass
+    assert not await table.fetch("SELECT id FROM role.role")
+
+
+async def test_bulk_upsert(db: Database):
+    """Updates the conflicting row and inserts the new one"""
+    table = role_table(db)
+    await table.insert({"id": 1, "name": "admin", "description": "old"})
+    returned = await table.bulk_upsert(
+        [
+            {"id": 1, "name": "admin", "description": "new"},
+            {"id": 2, "name": "guest", "description": "inserted"},
+        ],
+        returning="id, description",
+    )
+    # one list of records per row, in the order of the rows
+    assert [[(r["id"], r["description"]) for r in records] for records in returned] == [
+        [(1, "new")],
+        [(2, "inserted")],
+    ]
+    rows = await table.fetch("SELECT id, description FROM role.role ORDER BY id")
+    assert rows and [(r["id"], r["description"]) for r in rows] == [(1, "new"), (2, "inserted")]
+
+
+class CountingDatabase:
+    """answers every selection with the number of the query, optionally
+    waiting for `release` first"""
+    def __init__(self):
+        self.queries = 0
+        self.release: Optional[asyncio.Event] = None
+
+    async def fetch(self, sql: str, *args: Any) -> List[dict]:
+        self.queries += 1
+        n = self.queries
+        if self.release is not None:
+            await self.release.wait()
+        return [{"n": n}]
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[dict]:
+        return (await self.fetch(sql, *args))[0]
+
+
+async def test_select_cache_expires():
+    """Selections are reused until they are older than the TTL"""
+    fake = CountingDatabase()
+    table = role_table(fake, cache_ttl=0.05)  # type: ignore[arg-type]
+    assert await table.select({"id": 1}) == [{"n": 1}]
+    assert await table.select({"id": 1}) == [{"n": 1}]
+    await asyncio.sleep(0.1)
+    assert await table.select({"id": 1}) == [{"n": 2}]
+
+
+async def test_select_cache_invalidated_by_write():
+    """Writes drop the cached selections"""
+    fake = CountingDatabase()
+    table = role_table(fake, cache_ttl=60)  # type: ignore[arg-type]
+    assert await table.select({"id": 1}) == [{"n": 1}]
+    await table.fetch("UPDATE role.role SET name = 'x'")
+    assert fake.queries == 2
+    assert await table.select({"id": 1}) == [{"n": 3}]
+
+
+async def test_select_cache_skips_selection_overlapping_write():
+    """A selection which was running during a write is not cached, since
+    it might have read the rows before the write"""
+    fake = CountingDatabase()
+    table = role_table(fake, cache_ttl=60)  # type: ignore[arg-type]
+    fake.release = asyncio.Event()
+    selection = asyncio.create_task(table.select({"id": 1}))
+    await asyncio.sleep(0)
+    table._invalidate_selections()  # a write finished meanwhile
+    fake.release.set()
+    assert await selection == [{"n": 1}]
+    fake.release = None
+    assert await table.select({"id": 1}) == [{"n": 2}]
+
+
+async def test_select_row_returns_record_with_and_without_cache():
+    """select_row returns the record itself, also from the cache and
+    when the table returns DataFrames"""
+    for cache_ttl in (None, 60):
+        fake = CountingDatabase()
+        table = role_table(fake, cache_ttl=cache_ttl)  # type: ignore[arg-type]
+        table.return_as_dataframe(True)
+        row = await table.select_row({"id": 1})
+        assert row is not None and row["n"] == 1
+
+
+async def test_insert_many(db: Database):
+    """Inserts rows given as tuples with one statement and returns them"""
+    table = role_table(db)
+    returned = await table.insert_many(
+        ["id", "name"],
+        [(1, "admin"), (2, "guest")],
+        returning="id, name",
+    )
+    assert sorted((r["id"], r["name"]) for r in returned) == [(1, "admin"), (2, "guest")]
+    row = await table.select_row({"id": 2})
+    assert row and row["name"] == "guest"
+    # conflicting rows are skipped
+    returned = await table.insert_many(
+        ["id", "name"],
+        [(2, "other"), (3, "user")],
+        returning="id",
+        on_conflict="(id) DO NOTHING",
+    )
+    assert [r["id"] for r in returned] == [3]
+
+
+async def test_insert_many_rejects_rows_of_other_length(monkeypatch: pytest.MonkeyPatch):
+    """Rows with more or fewer values than columns are not truncated"""
+    # with_log only re-raises once table logging is set up, as in main
+    monkeypatch.setattr("src.db.table.log", logging_provider(__name__, "test"))
+    fake = CountingDatabase()
+    table = role_table(fake)  # type: ignore[arg-type]
+    for rows in ([(1, "admin"), (2,)], [(1, "admin", "description")]):
+        with pytest.raises(ValueError):
+            await table.insert_many(["id", "name"], rows)
+    assert fake.queries == 0
+
+
+async def test_insert_dataframe_across_batches(db: Database, monkeypatch: pytest.MonkeyPatch):
+    """DataFrames with more rows than fit into one statement are
+    inserted in several batches"""
+    # 2 columns, so a batch holds 2 rows
+    monkeypatch.setattr("src.db.table.MAX_QUERY_ARGS", 4)
+    table = role_table(db)
+    rows = pd.DataFrame({"id": range(5), "name": [f"role {i}" for i in range(5)]})
+    returned = await table.insert(rows, returning="id")
+    assert returned and sorted(r["id"] for r in returned) == list(range(5))
+    rows = await table.fetch("SELECT id FROM role.role")
+    assert rows and len(rows) == 5
+
+
+async def test_insert_dataframe_without_columns(monkeypatch: pytest.MonkeyPatch):
+    """DataFrames without columns are rejected instead of dividing by zero"""
+    monkeypatch.setattr("src.db.table.log", logging_provider(__name__, "test"))
+    fake = CountingDatabase()
+    table = role_table(fake)  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        await table.insert(pd.DataFrame(index=range(2)))
+    assert fake.queries == 0
+
+
+async def test_pipeline_commit(db: Database):
+    """Buffered writes are sent on commit, in the order they were added"""
+    table = role_table(db)
+    async with table.pipeline() as p:
+        for i in range(3):
+            p.insert({"id": i, "name": f"role {i}"})
+        p.update({"name": "admin"}, {"id": 0})
+        p.delete({"id": 2})
+        assert len(p) == 5
+        assert not await table.fetch("SELECT id FROM role.role")
+        await p.commit()
+        assert len(p) == 0
+        # writes after commit are sent when the block exits
+        p.insert({"id": 3, "name": "guest"})
+    rows = await table.fetch("SELECT id, name FROM role.role ORDER BY id")
+    assert rows and [(r["id"], r["name"]) for r in rows] == [(0, "admin"), (1, "role 1"), (3, "guest")]
+
+
+async def test_pipeline_discarded_on_error(db: Database):
+    """Writes which were not committed are dropped when the block fails"""
+    table = role_table(db)
+    try:
+        async with table.pipeline() as p:
+            p.insert({"id": 1, "name": "admin"})
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert not await table.fetch("SELECT id FROM role.role")
+
+
+async def test_copy_from_dataframe(db: Database):
+    """Copies a DataFrame directly, and through the staging table when
+    conflicts have to be handled"""
+    table = role_table(db)
+    status = await table.copy_from_dataframe(pd.DataFrame({"id": [1, 2], "name": ["admin", "guest"]}))
+    assert status == "COPY 2"
+    status = await table.copy_from_dataframe(
+        pd.DataFrame({"id": [2, 3], "name": ["other", "user"]}),
+        on_conflict="(id) DO NOTHING",
+    )
+    assert status == "INSERT 0 1"
+    rows = await table.fetch("SELECT id, name FROM role.role ORDER BY id")
+    assert rows and [(r["id"], r["name"]) for r in rows] == [(1, "admin"), (2, "guest"), (3, "user")]
@@ -1,4 +1,5 @@
-from dataclasses import replace
+import asyncio
+from dataclasses import asdict, replace
 from datetime import datetime
 from typing import AsyncGenerator, Optional
 import pytest
@@ -6,7 +7,7 @@ from testcontainers.postgres import PostgresContainer
 from src.db.entities.note.metadata import NoteEntity
 from src.db.entities.user.user import UserEntity
 from src.db.repos.note.note import NoteRepoFacadeABC, UserContext
-from src.db.repos.user.user import UserRepoABC
+from src.db.repos.user.user import SELECT_USER_BY_DISCORD_ID, UserRepoABC
 import src.api
 from src.db.repos import UserPostgresRepo, Database
 from src.utils import logging_provider
@@ -60,4 +61,47 @@ async def test_create_user_with_note_and_delete(user_repo: UserRepoABC, note_rep
     assert ret_user is None 
 
     with pytest.raises(RuntimeError, match="not found"):
-        ret_note = await note_repo_facade.select_by_id(note.note_id, ctx=ctx)
\ No newline at end of file
+        ret_note = await note_repo_facade.select_by_id(note.note_id, ctx=ctx)
+
+async def test_select_by_discord_id_after_delete(user_repo: UserRepoABC, test_user: UserEntity):
+    """A cached user must not be returned anymore once it was deleted"""
+    test_user = await user_repo.insert(test_user)
+    assert isinstance(test_user.id, int)
+    assert await user_repo.select_by_discord_id(test_user.discord_id) == test_user
+    await user_repo.delete(test_user.id)
+    assert await user_repo.select_by_discord_id(test_user.discord_id) is None
+
+async def test_upsert_user(user_repo: UserRepoABC, test_user: UserEntity):
+    """Upserts a user twice; the second upsert updates the existing row"""
+    inserted = await user_repo.upsert(test_user)
+    assert isinstance(inserted.id, int)
+    updated = await user_repo.upsert(replace(test_user, avatar="http://somewhere-else"))
+    assert updated.id == inserted.id
+    assert updated.avatar == "http://somewhere-else"
+    assert await user_repo.select(inserted.id) == updated
+
+async def test_select_by_discord_id_overlapping_update(test_user: UserEntity):
+    """A selection which read the user before a concurrent update must
+    not cache the outdated user"""
+    class PausingDatabase:
+        """returns `row`; selections by discord ID wait for `release`"""
+        def __init__(self):
+            self.row = {**asdict(test_user), "id": 1}
+            self.release = asyncio.Event()
+
+        async def fetchrow(self, query, *args):
+            row = dict(self.row)
+            if query == SELECT_USER_BY_DISCORD_ID:
+                await self.release.wait()
+            return row
+
+    db = PausingDatabase()
+    repo = UserPostgresRepo(db)  # type: ignore[arg-type]
+    selection = asyncio.create_task(repo.select_by_discord_id(test_user.discord_id))
+    await asyncio.sleep(0)
+    db.row["avatar"] = "http://updated"
+    await repo.update(replace(test_user, id=1, avatar="http://updated"))
+    db.release.set()
+    assert (await selection).avatar == test_user.avatar  # read before the update
+    user = await repo.select_by_discord_id(test_user.discord_id)
+    assert user and user.avatar == "http://updated"